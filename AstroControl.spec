@@ -1,15 +1,24 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+# Build em pasta (onedir): o one-file descompactava tudo no %TEMP% a cada
+# abertura, o que dominava o tempo de partida. Distribua a pasta
+# dist/AstroControl_v3 inteira (zip), o executavel fica dentro dela.
+
+import os
+
+# com o kernel recortado (astro_ephem_trim.py) o pacote leva so ele
+EPHEMERIS = 'de421_trim.bsp' if os.path.exists('de421_trim.bsp') else 'de421.bsp'
+
 a = Analysis(
     ['main3.0.py'],
     pathex=[],
     binaries=[],
-    datas=[('de421.bsp', '.')], # Copia o arquivo BSP para a raiz do EXE
-    hiddenimports=['skyfield', 'skyfield.api', 'PyQt6'],
+    datas=[(EPHEMERIS, '.'), ('catalog.csv', '.')], # Copia o BSP e o catalogo para a raiz do EXE
+    hiddenimports=['skyfield', 'skyfield.api', 'skyfield.almanac', 'PyQt6', 'astro_engine', 'astro_catalog', 'astro_planner', 'astro_telemetry', 'astro_sim', 'astro_satellites', 'astro_pointing', 'astro_atmosphere', 'sgp4.api'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['tkinter', 'matplotlib', 'IPython'],
     noarchive=False,
 )
 pyz = PYZ(a.pure)
@@ -17,20 +26,27 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='AstroControl_v3',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True, # Compacta o executável
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=False, # DLLs com UPX precisam ser descompactadas a cada abertura
     console=False, # Define como False para ocultar o terminal preto ao abrir
     disable_windowed_traceback=False,
     argv_emulation=False,
     target_arch=None,
     codesign_identity=None,
     entitlements_file=None,
-)
\ No newline at end of file
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='AstroControl_v3',
+)
@@ -0,0 +1,59 @@
+# MODELO DE ATMOSFERA (REFRACAO) DO ASTROCONTROL
+# Temperatura e pressao sao validadas uma vez (ao editar) e viram uma tabela
+# refracao x altitude calculada com a mesma formula do Skyfield (earthlib.refract).
+# Depois cada posicao so interpola a tabela; a tabela so e refeita quando
+# temperatura ou pressao mudam (cache por valor).
+# USO LIVRE :)
+
+from functools import lru_cache
+import numpy as np
+
+TEMP_RANGE = (-40.0, 50.0)          # °C
+PRESS_RANGE = (500.0, 1100.0)       # mbar (0 m a ~5500 m de altitude)
+REFRACTION_CACHE = 8                # modelos (temp, press) guardados
+
+# altitudes verdadeiras da tabela: densa perto do horizonte, onde a refracao
+# muda rapido; o Skyfield nao refrata abaixo de -1° nem acima de 89.9°
+REFRACTION_GRID = np.concatenate((
+    np.arange(-1.0, 5.0, 0.01),
+    np.arange(5.0, 20.0, 0.05),
+    np.arange(20.0, 89.9, 0.5),
+    [89.9],
+))
+
+class AtmosphereModel:
+    def __init__(self, temp, press):
+        from skyfield.earthlib import refract
+
+        if not TEMP_RANGE[0] <= temp <= TEMP_RANGE[1]:
+            raise ValueError(f"temperatura {temp:g} °C fora de {TEMP_RANGE[0]:g}..{TEMP_RANGE[1]:g}")
+        if not PRESS_RANGE[0] <= press <= PRESS_RANGE[1]:
+            raise ValueError(f"pressão {press:g} mbar fora de {PRESS_RANGE[0]:g}..{PRESS_RANGE[1]:g}")
+
+        self.temp = float(temp)
+        self.press = float(press)
+        self.table = refract(REFRACTION_GRID, self.temp, self.press) - REFRACTION_GRID
+
+    @classmethod
+    def parse(cls, temp_text, press_text):
+        # texto da janela ("10", "12,5") → modelo; ValueError com a causa
+        try:
+            temp = float(temp_text.strip().replace(',', '.'))
+            press = float(press_text.strip().replace(',', '.'))
+        except ValueError:
+            raise ValueError(f"'{temp_text}' / '{press_text}' não são números") from None
+        return refraction_model(temp, press)
+
+    def refraction(self, alt):
+        # graus a somar na altitude verdadeira (escalar ou array)
+        return np.interp(alt, REFRACTION_GRID, self.table, left=0.0, right=0.0)
+
+    def apply(self, alt):
+        return alt + self.refraction(alt)
+
+@lru_cache(maxsize=REFRACTION_CACHE)
+def refraction_model(temp, press):
+    # None, None = sem refracao
+    if temp is None or press is None:
+        return None
+    return AtmosphereModel(temp, press)
@@ -0,0 +1,129 @@
+# CATALOGO DE ESTRELAS E OBJETOS DE CEU PROFUNDO (MESSIER/NGC)
+# Carrega o catalogo local (catalog.csv: name,type,ra,dec,mag) em arrays NumPy,
+# calcula alt/az do catalogo inteiro numa unica chamada vetorizada do Skyfield
+# e indexa as posicoes fixas (RA/Dec J2000) numa grade 3D sobre a esfera celeste.
+# Catalogos maiores (Hipparcos, NGC completo) podem ser convertidos para o mesmo CSV.
+# USO LIVRE :)
+
+import csv
+import numpy as np
+from astro_atmosphere import refraction_model
+
+CATALOG_FILE = 'catalog.csv'
+GRID_CELL_DEG = 5.0         # lado aproximado de cada celula da grade
+
+def parse_sexagesimal(text):
+    # "06:45:08.9" / "-16:42:58" → numero decimal
+    sign = -1.0 if text.strip().startswith('-') else 1.0
+    parts = [abs(float(p)) for p in text.strip().lstrip('+-').split(':')]
+    while len(parts) < 3:
+        parts.append(0.0)
+    return sign * (parts[0] + parts[1] / 60.0 + parts[2] / 3600.0)
+
+def unit_vectors(ra_deg, dec_deg):
+    ra = np.radians(ra_deg)
+    dec = np.radians(dec_deg)
+    return np.column_stack((np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)))
+
+# ================= Indice espacial =================
+# Grade de cubos sobre os vetores unitarios: vizinhos no ceu caem em celulas
+# vizinhas, entao a busca so olha umas poucas celulas e nao o catalogo todo.
+class SkyGrid:
+    def __init__(self, xyz, cell_deg=GRID_CELL_DEG):
+        self.xyz = xyz
+        self.cell = 2 * np.sin(np.radians(cell_deg) / 2)   # corda equivalente
+        keys = np.floor((xyz + 1.0) / self.cell).astype(np.int64)
+        self.cells = {}
+        for i, key in enumerate(map(tuple, keys)):
+            self.cells.setdefault(key, []).append(i)
+        self.cells = {k: np.array(v) for k, v in self.cells.items()}
+
+    def within(self, xyz, radius_deg):
+        # indices a ate radius_deg do ponto (vetor unitario xyz)
+        chord = 2 * np.sin(np.radians(min(radius_deg, 180.0)) / 2)
+        lo = np.floor((xyz - chord + 1.0) / self.cell).astype(np.int64)
+        hi = np.floor((xyz + chord + 1.0) / self.cell).astype(np.int64)
+
+        found = [
+            self.cells[(i, j, k)]
+            for i in range(lo[0], hi[0] + 1)
+            for j in range(lo[1], hi[1] + 1)
+            for k in range(lo[2], hi[2] + 1)
+            if (i, j, k) in self.cells
+        ]
+        if not found:
+            return np.empty(0, dtype=np.int64)
+
+        idx = np.concatenate(found)
+        dist = np.linalg.norm(self.xyz[idx] - xyz, axis=1)
+        return idx[dist <= chord]
+
+    def nearest(self, xyz, count=1, radius_deg=GRID_CELL_DEG):
+        # amplia o raio ate achar `count` objetos; devolve (indices, separacao °)
+        while True:
+            idx = self.within(xyz, radius_deg)
+            if len(idx) >= count or radius_deg >= 180.0:
+                break
+            radius_deg *= 2
+
+        cos_sep = np.clip(self.xyz[idx] @ xyz, -1.0, 1.0)
+        order = np.argsort(-cos_sep)[:count]
+        return idx[order], np.degrees(np.arccos(cos_sep[order]))
+
+# ================= Catalogo =================
+class Catalog:
+    def __init__(self, path):
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+
+        self.names = np.array([r['name'] for r in rows])
+        self.kinds = np.array([r['type'] for r in rows])
+        self.ra_hours = np.array([parse_sexagesimal(r['ra']) for r in rows])
+        self.dec_deg = np.array([parse_sexagesimal(r['dec']) for r in rows])
+        self.mag = np.array([float(r['mag']) for r in rows])
+        self.index = {name.lower(): i for i, name in enumerate(self.names)}
+
+        self.grid = SkyGrid(unit_vectors(self.ra_hours * 15.0, self.dec_deg))
+        self.stars = None
+        self.bodies = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name.lower() in self.index
+
+    def vector(self):
+        # um unico Star com arrays: o Skyfield calcula todos de uma vez
+        if self.stars is None:
+            from skyfield.api import Star
+            self.stars = Star(ra_hours=self.ra_hours, dec_degrees=self.dec_deg)
+        return self.stars
+
+    def body(self, name):
+        i = self.index[name.lower()]
+        if i not in self.bodies:
+            from skyfield.api import Star
+            self.bodies[i] = Star(ra_hours=self.ra_hours[i], dec_degrees=self.dec_deg[i])
+        return self.bodies[i]
+
+    def altaz(self, observer, t, temp=None, press=None):
+        # alt/az do catalogo inteiro em um instante
+        astrometric = observer.at(t).observe(self.vector()).apparent()
+        alt, az, _ = astrometric.altaz()
+        atmosphere = refraction_model(temp, press)
+        if atmosphere is not None:
+            return az.degrees, atmosphere.apply(alt.degrees)
+        return az.degrees, alt.degrees
+
+    def visible(self, az, alt, min_alt=20.0, max_mag=None):
+        # indices acima de min_alt (e ate max_mag), do mais brilhante ao mais fraco
+        mask = alt >= min_alt
+        if max_mag is not None:
+            mask &= self.mag <= max_mag
+        idx = np.nonzero(mask)[0]
+        return idx[np.argsort(self.mag[idx])]
+
+    def nearest(self, ra_hours, dec_deg, count=5):
+        xyz = unit_vectors(np.array([ra_hours * 15.0]), np.array([dec_deg]))[0]
+        return self.grid.nearest(xyz, count)
@@ -0,0 +1,1594 @@
+# NUCLEO DO ASTROCONTROL SEM INTERFACE GRAFICA (SEM PyQt6)
+# Efemeride, cache de trajetoria, loop de TRACK e protocolo serial com o tracker3.0.ino.
+# Usado pela janela (main3.0.py) e pelo modo headless (astro_headless.py), ex. Raspberry Pi junto ao mount.
+# USO LIVRE :)
+
+import sys
+import os
+import time
+import struct
+import threading
+from collections import deque
+import numpy as np
+import serial
+from astro_catalog import Catalog, CATALOG_FILE
+from astro_pointing import PointingModel
+from astro_atmosphere import refraction_model
+from astro_satellites import SatelliteCatalog, TLE_FILE, PASS_MIN_ALT, find_passes
+import astro_telemetry as telemetry
+from astro_log import LogBuffer, print_line, DEBUG, INFO, WARNING, ERROR
+
+SERIAL_READ_TIMEOUT = 0.2   # read bloqueante; so limita o tempo de parada
+URGENT_COMMANDS = ("STOP", "GOTO", "ZERO")
+BAUD_RATES = [9600, 19200, 38400, 57600, 115200, 230400, 250000]
+DEFAULT_BAUD = 9600         # igual ao SERIAL_BAUD do tracker3.0.ino (HC-05); USB sobe com BAUD
+TELEMETRY_MS = 200          # periodo da telemetria binaria de posicao
+TRACK_RATE_HZ = 10.0        # frequencia do loop de TRACK (padrao)
+
+# mesma mecanica do tracker3.0.ino
+AZ_STEPS_PER_DEG = 20.0
+ALT_STEPS_PER_DEG = 20.0
+MAX_SPEED_STEPS = 800.0     # setMaxSpeed (passos/s)
+ACCEL_STEPS = 400.0         # setAcceleration (passos/s²)
+AZ_WRAP_DEG = 270.0         # enrolamento do cabo: az mecanico em [-270, +270] desde o ZERO
+ALT_MIN_DEG = 0.0
+ALT_MAX_DEG = 90.0
+
+# local padrao do observador
+DEFAULT_LATITUDE = -26.259963
+DEFAULT_LONGITUDE = -52.675883
+DEFAULT_ELEVATION = 800
+
+TARGETS = ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter Barycenter", "Saturn Barycenter"]
+
+# kernel recortado pelo astro_ephem_trim.py tem preferencia sobre o de421 completo
+FULL_EPHEMERIS = 'de421.bsp'
+TRIMMED_EPHEMERIS = 'de421_trim.bsp'
+
+def emit(callback, *args):
+    if callback is not None:
+        callback(*args)
+
+def axis_move_time(steps, max_speed=MAX_SPEED_STEPS, accel=ACCEL_STEPS):
+    # perfil trapezoidal do AccelStepper (triangular se nao chega na velocidade maxima)
+    steps = np.abs(steps)
+    ramp = max_speed * max_speed / accel    # passos para acelerar + frear
+    return np.where(
+        steps < ramp,
+        2 * np.sqrt(steps / accel),
+        2 * max_speed / accel + (steps - ramp) / max_speed
+    )
+
+def move_time(az0, alt0, az1, alt1):
+    # os dois eixos andam juntos; vale o mais lento (az mecanico, sem volta)
+    return np.maximum(
+        axis_move_time((az1 - az0) * AZ_STEPS_PER_DEG),
+        axis_move_time((alt1 - alt0) * ALT_STEPS_PER_DEG)
+    )
+
+def slew_time(az0, alt0, az1, alt1):
+    # estimativa entre posicoes do ceu (menor delta de azimute)
+    delta_az = (az1 - az0 + 180) % 360 - 180
+    return move_time(az0, alt0, az0 + delta_az, alt1)
+
+def resource_path(relative_path):
+    try:
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+def find_ephemeris():
+    trimmed = resource_path(TRIMMED_EPHEMERIS)
+    return trimmed if os.path.exists(trimmed) else resource_path(FULL_EPHEMERIS)
+
+# ================= Protocolo binario =================
+# Frame: 0x02 cmd payload chk 0x03, chk = soma(cmd + payload) & 0xFF
+SEG_MAX = 5         # segmentos por agenda (buffer serial do UNO e 64 bytes)
+SEG_DT_S = 2.0      # duracao de cada segmento
+SEG_PUSH_S = 4.0    # intervalo de envio de agenda nova (sobreposta)
+
+SERIAL_LINE_MAX = 1024      # descarta lixo sem '\n' acima disso
+
+# tamanho do payload por comando (None = variavel, ver frame_size)
+#   host → mount: 'T' track, 'S' agenda (milideg/s); 'U', 'V' o mesmo em microdeg/s
+#   mount → host: 'P' posicao (passos AZ/ALT i32), 'A' ack (cmd), 'E' erro (codigo, cmd)
+FRAME_PAYLOAD = {
+    b'T'[0]: 8, b'S'[0]: None, b'U'[0]: 8, b'V'[0]: None,
+    b'P'[0]: 8, b'A'[0]: 1, b'E'[0]: 2,
+}
+
+# unidades por °/s de cada frame de velocidade e a agenda correspondente
+RATE_SCALE = {b'T': 1000.0, b'U': 1000000.0}
+SCHEDULE_CMD = {b'T': b'S', b'U': b'V'}
+FIRMWARE_HIRES = 2          # "OK VER 2" em diante aceita 'U'/'V'
+
+FRAME_ERRORS = {1: "checksum", 2: "tamanho"}
+
+def frame_size(buf, pos):
+    # tamanho total do frame em buf[pos]; None se ainda faltam bytes, -1 se invalido
+    if pos + 1 >= len(buf):
+        return None
+    cmd = buf[pos + 1]
+    if cmd not in FRAME_PAYLOAD:
+        return -1
+    size = FRAME_PAYLOAD[cmd]
+    if size is None:
+        if pos + 2 >= len(buf):
+            return None
+        size = 1 + buf[pos + 2] * 10
+    return size + 4
+
+class FrameParser:
+    # separa linhas ASCII ('\n') e frames binarios (STX ... ETX) do mesmo fluxo
+    def __init__(self):
+        self.buffer = bytearray()
+        self.bad_frames = 0
+
+    def feed(self, data):
+        buf = self.buffer
+        buf += data
+        events = []
+        pos = 0
+
+        while pos < len(buf):
+            if buf[pos] == 0x02:
+                size = frame_size(buf, pos)
+                if size is None or pos + size > len(buf):
+                    break
+                if size > 0 and buf[pos + size - 1] == 0x03 \
+                        and buf[pos + size - 2] == sum(buf[pos + 1:pos + size - 2]) & 0xFF:
+                    events.append(("frame", chr(buf[pos + 1]), bytes(buf[pos + 2:pos + size - 2])))
+                    pos += size
+                else:
+                    # frame corrompido: pula o tamanho declarado (a linha que
+                    # vem depois sobrevive); cmd desconhecido: so o STX
+                    self.bad_frames += 1
+                    pos += size if size > 0 else 1
+                continue
+
+            end = buf.find(b'\n', pos)
+            stx = buf.find(b'\x02', pos)
+            if 0 <= stx and (end < 0 or stx < end):
+                # resto de linha cortada por um frame: descarta
+                pos = stx
+                continue
+            if end < 0:
+                break
+
+            try:
+                text = buf[pos:end].decode('ascii').strip()
+                if text:
+                    events.append(("line", None, text))
+            except UnicodeDecodeError:
+                self.bad_frames += 1
+            pos = end + 1
+
+        # bytearray remove do inicio sem copiar o resto
+        del buf[:pos]
+        if len(buf) > SERIAL_LINE_MAX:
+            buf.clear()
+        return events
+
+def build_frame(cmd: bytes, payload: bytes) -> bytes:
+    chk = sum(cmd + payload) & 0xFF
+    return b'\x02' + cmd + payload + bytes([chk]) + b'\x03'
+
+def build_track_frame(vaz, valt, cmd=b'T'):
+    # °/s → inteiro na escala do frame (milideg/s em 'T', microdeg/s em 'U')
+    scale = RATE_SCALE[cmd]
+    return build_frame(
+        cmd,
+        round(vaz * scale).to_bytes(4, 'little', signed=True) +
+        round(valt * scale).to_bytes(4, 'little', signed=True)
+    )
+
+def build_schedule_frame(segments, cmd=b'T'):
+    # segments: [(offset_s, vaz, valt), ...]; cmd = frame de velocidade ('T'/'U')
+    scale = RATE_SCALE[cmd]
+    payload = bytes([len(segments)])
+    for offset, vaz, valt in segments:
+        payload += (
+            int(round(offset * 1000)).to_bytes(2, 'little') +
+            round(vaz * scale).to_bytes(4, 'little', signed=True) +
+            round(valt * scale).to_bytes(4, 'little', signed=True)
+        )
+    return build_frame(SCHEDULE_CMD[cmd], payload)
+
+# ================= Quantizacao das velocidades =================
+# O frame so carrega multiplos de 1/scale °/s. Arredondar cada tick sozinho
+# deixa um erro sistematico (0.004°/s em milideg/s erra ate 12%). Sigma-delta:
+# o que o tick anterior andou a menos (ou a mais) por causa do arredondamento
+# entra na velocidade do proximo, entao a media longa e exata e o erro de
+# posicao fica limitado a um degrau de quantizacao x periodo.
+DITHER_MAX_DEG = 0.01       # erro carregado maximo (GOTO, limite de velocidade)
+
+class RateQuantizer:
+    def __init__(self, scale=RATE_SCALE[b'T'], period=1.0 / TRACK_RATE_HZ, dither=True):
+        self.scale = scale
+        self.period = period
+        self.dither = dither
+        self.reset()
+
+    def reset(self):
+        self.residual = [0.0, 0.0]  # graus devidos por eixo
+        self.last = None            # (instante, [(offset, pedido, enviado), ...]) em curso
+
+    def credit(self, now):
+        # soma o erro so do que cada segmento em curso realmente rodou: uma
+        # agenda nova substitui a anterior antes dos ultimos segmentos
+        if self.last is None:
+            return
+        t0, segments = self.last
+        elapsed = now - t0
+        for k, (offset, wanted, sent) in enumerate(segments):
+            end = segments[k + 1][0] if k + 1 < len(segments) else elapsed
+            run = min(elapsed, end) - offset
+            if run <= 0:
+                break
+            for i in range(2):
+                self.residual[i] += (wanted[i] - sent[i]) * run
+        for i in range(2):
+            self.residual[i] = max(-DITHER_MAX_DEG, min(DITHER_MAX_DEG, self.residual[i]))
+
+    def round(self, v, residual, dt):
+        if self.dither:
+            v += residual / dt
+        return round(v * self.scale) / self.scale
+
+    def quantize(self, vaz, valt, now):
+        # devolve as velocidades (°/s) exatamente representaveis no frame
+        self.credit(now)
+        wanted = (vaz, valt)
+        sent = tuple(self.round(v, r, self.period) for v, r in zip(wanted, self.residual))
+        self.last = (now, [(0.0, wanted, sent)])
+        return sent
+
+    def quantize_segments(self, segments, dt, now):
+        # agenda: mesmo sigma-delta de um segmento para o proximo, partindo
+        # do residuo que as agendas anteriores deixaram
+        self.credit(now)
+        residual = list(self.residual)
+        out, running = [], []
+        for offset, vaz, valt in segments:
+            wanted = (vaz, valt)
+            sent = tuple(self.round(v, r, dt) for v, r in zip(wanted, residual))
+            for i in range(2):
+                residual[i] += (wanted[i] - sent[i]) * dt
+            out.append((offset, *sent))
+            running.append((offset, wanted, sent))
+        self.last = (now, running)
+        return out
+
+# ================= Serial =================
+class SerialLink(threading.Thread):
+    # callbacks (chamados na thread da serial):
+    #   on_line(str), on_status(bool, str), on_position(passos AZ, passos ALT),
+    #   on_ack(cmd), on_error(codigo, cmd)
+    def __init__(self, port, baud=DEFAULT_BAUD):
+        super().__init__(daemon=True)
+        self.on_line = None
+        self.on_status = None
+        self.on_position = None
+        self.on_ack = None
+        self.on_error = None
+        self.port = port
+        self.baud = baud
+        self.pending_baud = None
+        self.running = True
+        self.ser = None
+        self.parser = FrameParser()
+
+        # === Fila de saida ===
+        # so a thread de escrita toca em ser.write; quem chama apenas enfileira
+        self.out_cond = threading.Condition()
+        self.out_urgent = deque()       # STOP / GOTO / ZERO
+        self.out_normal = deque()       # demais comandos de texto
+        self.out_track = None           # ultimo frame TRACK/agenda (coalescido)
+        self.bytes_sent = 0
+        self.coalesced = 0
+        self.sent_log = deque()         # (instante, bytes) do ultimo segundo
+
+    def run(self):
+        try:
+            self.ser = serial.Serial(self.port, self.baud, timeout=SERIAL_READ_TIMEOUT)
+            emit(self.on_status, True, "🟢 Serial conectada")
+
+            writer = threading.Thread(target=self.write_loop, daemon=True)
+            writer.start()
+
+            while self.running:
+                # bloqueia ate chegar dado (ou timeout): sem polling, sem sleep
+                data = self.ser.read(max(1, self.ser.in_waiting))
+                if not data:
+                    continue
+
+                # linhas de texto e frames binarios vem misturados
+                for kind, cmd, value in self.parser.feed(data):
+                    if kind == "line":
+                        if value == "OK BAUD" and self.pending_baud:
+                            self.switch_baud()
+                        emit(self.on_line, value)
+                    elif cmd == "P":
+                        emit(self.on_position, *struct.unpack('<ii', value))
+                    elif cmd == "A":
+                        emit(self.on_ack, chr(value[0]))
+                    elif cmd == "E":
+                        emit(self.on_error, value[0], chr(value[1]))
+
+        except Exception as e:
+            if self.running:
+                emit(self.on_status, False, f"🔴 Serial erro: {e}")
+        finally:
+            with self.out_cond:
+                self.running = False
+                self.out_cond.notify()
+            if self.ser:
+                self.ser.close()
+
+    def send(self, data: str):
+        with self.out_cond:
+            if data.startswith(URGENT_COMMANDS):
+                # STOP/GOTO/ZERO passam na frente e invalidam o TRACK pendente
+                self.out_urgent.append(data.encode())
+                if self.out_track is not None:
+                    self.out_track = None
+                    self.coalesced += 1
+            else:
+                self.out_normal.append(data.encode())
+            self.out_cond.notify()
+
+    def send_frame(self, frame: bytes):
+        # TRACK/agenda: so a velocidade mais recente importa
+        with self.out_cond:
+            if self.out_track is not None:
+                self.coalesced += 1
+            self.out_track = frame
+            self.out_cond.notify()
+
+    def request_baud(self, baud):
+        # o Arduino confirma na velocidade antiga ("OK BAUD") e so entao trocamos
+        self.pending_baud = baud
+        self.send(f"BAUD {baud}\n")
+
+    def switch_baud(self):
+        self.baud, self.pending_baud = self.pending_baud, None
+        self.ser.baudrate = self.baud
+        emit(self.on_status, True, f"🟢 Serial em {self.baud} baud")
+
+    def queue_depth(self):
+        return len(self.out_urgent) + len(self.out_normal) + (self.out_track is not None)
+
+    def bytes_per_second(self):
+        cutoff = time.monotonic() - 1.0
+        with self.out_cond:
+            while self.sent_log and self.sent_log[0][0] < cutoff:
+                self.sent_log.popleft()
+            return sum(n for _, n in self.sent_log)
+
+    def write_loop(self):
+        while True:
+            with self.out_cond:
+                while self.running and not self.queue_depth():
+                    self.out_cond.wait()
+                if not self.running:
+                    return
+
+                if self.out_urgent:
+                    data = self.out_urgent.popleft()
+                elif self.out_normal:
+                    data = self.out_normal.popleft()
+                else:
+                    data, self.out_track = self.out_track, None
+
+            try:
+                # pode bloquear com o buffer de 9600 baud cheio; so trava esta thread
+                self.ser.write(data)
+            except Exception as e:
+                if self.running:
+                    emit(self.on_status, False, f"🔴 Serial erro: {e}")
+                return
+
+            with self.out_cond:
+                self.bytes_sent += len(data)
+                self.sent_log.append((time.monotonic(), len(data)))
+
+    def stop(self):
+        with self.out_cond:
+            self.running = False
+            self.out_cond.notify()
+        if self.ser and hasattr(self.ser, "cancel_read"):
+            # acorda o read bloqueante na hora (POSIX)
+            self.ser.cancel_read()
+
+    def wait(self, timeout=None):
+        self.join(timeout)
+
+# ================= Realimentacao de posicao =================
+# Compara a posicao real do mount (passos, frame 'P') com a efemeride e
+# soma uma correcao proporcional as velocidades do TRACK.
+FEEDBACK_PERIOD_S = 2.0     # intervalo entre consultas POS
+FEEDBACK_GAIN = 0.25        # 1/s; ganho * periodo < 1 para nao oscilar
+FEEDBACK_MAX_RATE = 0.05    # °/s, limite da correcao
+FEEDBACK_MAX_ERROR = 5.0    # °, acima disso nao corrige (sem ZERO/GOTO em curso)
+
+class PositionFeedback:
+    def __init__(self, gain=FEEDBACK_GAIN, max_rate=FEEDBACK_MAX_RATE, max_error=FEEDBACK_MAX_ERROR):
+        self.gain = gain
+        self.max_rate = max_rate
+        self.max_error = max_error
+        self.reset()
+
+    def reset(self):
+        self.err_az = None
+        self.err_alt = None
+        self.corr_az = 0.0
+        self.corr_alt = 0.0
+
+    def update(self, target_az, target_alt, tel_az, tel_alt):
+        self.err_az = (target_az - tel_az + 180) % 360 - 180
+        self.err_alt = target_alt - tel_alt
+
+        if abs(self.err_az) > self.max_error or abs(self.err_alt) > self.max_error:
+            self.corr_az = 0.0
+            self.corr_alt = 0.0
+            return
+
+        limit = self.max_rate
+        self.corr_az = max(-limit, min(limit, self.gain * self.err_az))
+        self.corr_alt = max(-limit, min(limit, self.gain * self.err_alt))
+
+    def apply(self, vaz, valt):
+        return vaz + self.corr_az, valt + self.corr_alt
+
+# ================= Agendador do TRACK =================
+# Ticks em instantes absolutos (inicio + k*periodo) no relogio monotonico: o
+# tempo gasto no tick nao acumula deriva e ajuste de NTP nao mexe no ritmo.
+# Tick atrasado mais de um periodo pula os perdidos em vez de disparar em
+# rajada. O atraso de cada tick (acordou - previsto) vai para um histograma.
+JITTER_BINS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100)
+JITTER_RECENT = 600         # atrasos recentes para os percentis
+
+class TrackScheduler(threading.Thread):
+    def __init__(self, tick, rate_hz=TRACK_RATE_HZ):
+        super().__init__(daemon=True)
+        self.tick = tick            # tick(atraso em s)
+        self.period = 1.0 / rate_hz
+        self.stop_event = threading.Event()
+        self.histogram = [0] * (len(JITTER_BINS_MS) + 1)
+        self.recent = deque(maxlen=JITTER_RECENT)
+        self.ticks = 0
+        self.missed = 0
+        self.max_late = 0.0
+
+    def run(self):
+        deadline = time.monotonic()
+        while True:
+            wait = deadline - time.monotonic()
+            if wait > 0 and self.stop_event.wait(wait):
+                return
+            if self.stop_event.is_set():
+                return
+
+            late = time.monotonic() - deadline
+            self.observe(late)
+            self.tick(late)
+
+            deadline += self.period
+            behind = time.monotonic() - deadline
+            if behind > self.period:
+                skipped = int(behind / self.period)
+                self.missed += skipped
+                deadline += skipped * self.period
+
+    def observe(self, late):
+        ms = late * 1000.0
+        i = 0
+        while i < len(JITTER_BINS_MS) and ms > JITTER_BINS_MS[i]:
+            i += 1
+        self.histogram[i] += 1
+        self.recent.append(ms)
+        self.ticks += 1
+        self.max_late = max(self.max_late, ms)
+
+    def stop(self):
+        self.stop_event.set()
+
+    def summary(self):
+        recent = sorted(self.recent)
+        if not recent:
+            return f"{1 / self.period:.0f} Hz | sem ticks"
+        p50 = recent[len(recent) // 2]
+        p99 = recent[min(len(recent) - 1, int(0.99 * len(recent)))]
+        return (f"{1 / self.period:.0f} Hz | atraso p50 {p50:.2f} ms p99 {p99:.2f} ms "
+                f"max {self.max_late:.1f} ms | perdidos {self.missed}")
+
+    def histogram_lines(self):
+        labels = [f"≤ {b:g} ms" for b in JITTER_BINS_MS] + [f"> {JITTER_BINS_MS[-1]:g} ms"]
+        total = max(1, self.ticks)
+        return [
+            f"{label:>9}: {count:6d} {'#' * round(40 * count / total)}"
+            for label, count in zip(labels, self.histogram)
+        ]
+
+# ================= Caminho do GOTO =================
+# O host escolhe o caminho e manda o az mecanico (desenrolado desde o ZERO):
+# o mesmo azimute do ceu pode ser alcancado em voltas diferentes, vale a mais
+# rapida que nao passa do enrolamento do cabo. Com safe_alt > 0 o tubo nao gira
+# em azimute abaixo dessa altitude (tripe, muretas): sobe, gira e desce.
+SLEW_SAFE_ALT = 0.0         # ° (0 = desligado)
+SLEW_SAFE_AZ_DEG = 5.0      # giros menores que isso nao precisam subir
+SLEW_SETTLE_S = 0.5         # folga entre um waypoint e o proximo
+
+def slew_route(az0, alt0, az1, alt1, safe_alt=SLEW_SAFE_ALT):
+    if safe_alt <= 0 or abs(az1 - az0) <= SLEW_SAFE_AZ_DEG or min(alt0, alt1) >= safe_alt:
+        return [(az1, alt1)]
+
+    waypoints = []
+    if alt0 < safe_alt:
+        waypoints.append((az0, safe_alt))
+    waypoints.append((az1, max(alt1, safe_alt)))
+    if alt1 < safe_alt:
+        waypoints.append((az1, alt1))
+    return waypoints
+
+def path_time(az, alt, waypoints):
+    total = 0.0
+    for next_az, next_alt in waypoints:
+        total += float(move_time(az, alt, next_az, next_alt))
+        az, alt = next_az, next_alt
+    return total
+
+def plan_slew(mech_az, alt, target_az, target_alt, wrap=AZ_WRAP_DEG, safe_alt=SLEW_SAFE_ALT):
+    # devolve (waypoints [(az mecanico, alt), ...], segundos previstos)
+    target_alt = min(max(target_alt, ALT_MIN_DEG), ALT_MAX_DEG)
+    base = float(target_az) % 360
+    best = None
+    for turn in range(-2, 3):
+        az = base + turn * 360
+        if not -wrap <= az <= wrap:
+            continue
+        waypoints = slew_route(mech_az, alt, az, target_alt, safe_alt)
+        seconds = path_time(mech_az, alt, waypoints)
+        # empate: fica com a volta menos enrolada
+        rank = (round(seconds, 2), abs(az))
+        if best is None or rank < best[0]:
+            best = (rank, waypoints, seconds)
+    return best[1], best[2]
+
+# ================= Worker de calculo =================
+# Todo calculo pesado do Skyfield roda aqui, fora da thread da interface
+# e do loop de TRACK.
+# Pedidos com a mesma tag substituem o pendente (so o mais recente importa).
+class ComputeWorker(threading.Thread):
+    # callbacks (chamados na thread de calculo): on_result(tag, resultado), on_failed(tag, msg)
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.on_result = None
+        self.on_failed = None
+        self.running = True
+        self.pending = {}
+        self.cond = threading.Condition()
+
+    def submit(self, tag, fn, *args):
+        with self.cond:
+            self.pending.pop(tag, None)
+            self.pending[tag] = (fn, args)
+            self.cond.notify()
+
+    def run(self):
+        while True:
+            with self.cond:
+                while self.running and not self.pending:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                tag = next(iter(self.pending))
+                fn, args = self.pending.pop(tag)
+
+            try:
+                emit(self.on_result, tag, fn(*args))
+            except Exception as e:
+                emit(self.on_failed, tag, str(e))
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+
+    def wait(self, timeout=None):
+        self.join(timeout)
+
+# ================= Cache de trajetoria =================
+# Em vez de rodar o Skyfield a cada tick do TRACK (100 ms), calcula a
+# trajetoria do alvo de uma vez (vetorizado) e so interpola nos ticks.
+TRAJ_SPAN_S = 600       # janela pre-calculada (10 min)
+TRAJ_STEP_S = 1.0       # espacamento das amostras
+TRAJ_REFRESH_S = 120    # recalcula em background quando faltar menos que isso
+TRAJ_RETRY_S = 30       # depois de um calculo que falhou, espera isso antes de tentar de novo
+
+# satelites (LEO) andam graus por segundo: perfil denso e janela curta
+SAT_TRAJECTORY = {"span": 300, "step": 0.1, "refresh": 60}
+
+class TrajectoryCache:
+    def __init__(self, ts, compute, submit=None, span=TRAJ_SPAN_S, step=TRAJ_STEP_S, refresh=TRAJ_REFRESH_S):
+        self.ts = ts
+        self.compute = compute      # compute(times, key) -> (az[], alt[])
+        self.submit = submit or self._submit_thread
+        self.span = span
+        self.step = step
+        self.refresh = refresh
+        self.data = None            # (key, jd[], az_unwrap[], alt[], vaz[], valt[])
+        self.refreshing = False
+        self.error = None           # excecao do ultimo calculo (None = ok)
+        self.failed_at = None
+
+    def build(self, tt, key):
+        n = int(self.span / self.step) + 1
+        jd = tt + np.arange(n) * (self.step / 86400.0)
+        az, alt = self.compute(self.ts.tt_jd(jd), key)
+        # desenrola o azimute para a interpolacao nao quebrar em 0/360
+        az = np.degrees(np.unwrap(np.radians(az)))
+        # velocidades (°/s) por diferenca central sobre as amostras do
+        # proprio cache: sem ruido de relogio e sem custo extra por tick
+        vaz = np.gradient(az, self.step)
+        valt = np.gradient(alt, self.step)
+        self.data = (key, jd, az, alt, vaz, valt)
+        return self.data
+
+    def _submit_thread(self, fn, *args):
+        threading.Thread(target=fn, args=args, daemon=True).start()
+
+    def _build_background(self, tt, key):
+        try:
+            self.build(tt, key)
+            self.error = None
+            self.failed_at = None
+        except Exception as e:
+            self.error = e
+            self.failed_at = time.monotonic()
+        finally:
+            self.refreshing = False
+
+    def az_alt(self, t, key):
+        state = self.state(t, key)
+        return None if state is None else state[:2]
+
+    def window(self, t, key):
+        # janela valida para t; None enquanto a trajetoria esta sendo calculada
+        tt = t.tt
+        data = self.data
+        valid = data is not None and data[0] == key and data[1][0] <= tt <= data[1][-1]
+
+        if not valid or (data[1][-1] - tt) * 86400.0 < self.refresh:
+            retry = self.failed_at is None or time.monotonic() - self.failed_at >= TRAJ_RETRY_S
+            if not self.refreshing and retry:
+                self.refreshing = True
+                self.submit(self._build_background, tt, key)
+            if not valid:
+                return None
+
+        return data
+
+    def state(self, t, key):
+        # (az, alt, vaz, valt)
+        data = self.window(t, key)
+        if data is None:
+            return None
+
+        tt = t.tt
+        _, jd, az, alt, vaz, valt = data
+        return (
+            float(np.interp(tt, jd, az)) % 360,
+            float(np.interp(tt, jd, alt)),
+            float(np.interp(tt, jd, vaz)),
+            float(np.interp(tt, jd, valt))
+        )
+
+    def segments(self, t, key, count, dt):
+        # velocidade media de cada segmento [t + i*dt, t + (i+1)*dt]; usando
+        # a media (e nao a instantanea) a posicao nao acumula erro na agenda
+        data = self.window(t, key)
+        if data is None:
+            return None
+
+        _, jd, az, alt, _, _ = data
+        edges = t.tt + np.arange(count + 1) * (dt / 86400.0)
+        if edges[-1] > jd[-1]:
+            return None
+
+        vaz = np.diff(np.interp(edges, jd, az)) / dt
+        valt = np.diff(np.interp(edges, jd, alt)) / dt
+        return [(i * dt, float(vaz[i]), float(valt[i])) for i in range(count)]
+
+# ================= Efemeride =================
+class Ephemeris:
+    def __init__(self, path):
+        # import adiado: Skyfield e de421.bsp so carregam aqui (na thread de
+        # calculo), a janela/headless sobe sem esperar por eles
+        from skyfield.api import load
+        from skyfield.jpllib import SpiceKernel
+
+        t = time.perf_counter()
+        self.ts = load.timescale()
+        self.timings = [("timescale", time.perf_counter() - t)]
+
+        # SpiceKernel abre o arquivo direto (sem a logica de download do
+        # load) e o jplephem mapeia os segmentos com mmap somente leitura:
+        # a memoria residente cresce so com as paginas realmente usadas
+        t = time.perf_counter()
+        self.path = path
+        self.planets = SpiceKernel(path)
+        self.earth = self.planets['earth']
+        self.timings.append(("abrir efemeride", time.perf_counter() - t))
+
+        # intervalo coberto por todos os segmentos (estreito se recortado)
+        self.start_jd = max(s.spk_segment.start_jd for s in self.planets.segments)
+        self.end_jd = min(s.spk_segment.end_jd for s in self.planets.segments)
+
+        # cache dos observadores (earth + Topos) e dos corpos; por local e por
+        # alvo porque varios mounts podem usar a mesma efemeride
+        self.observers = {}         # (lat, lon, elev) → observador
+        self.bodies = {}            # nome → corpo
+        self.geo_hits = 0
+        self.geo_rebuilds = 0
+
+        # estrelas / DSO (opcional)
+        t = time.perf_counter()
+        catalog_path = resource_path(CATALOG_FILE)
+        self.catalog = Catalog(catalog_path) if os.path.exists(catalog_path) else None
+        self.timings.append(("catalogo", time.perf_counter() - t))
+
+        # satelites artificiais (opcional, TLE local; ver astro_satellites.py)
+        t = time.perf_counter()
+        self.satellites = SatelliteCatalog(TLE_FILE, self.ts) if os.path.exists(TLE_FILE) else None
+        self.timings.append(("satelites", time.perf_counter() - t))
+
+    def geometry(self, target, lat, lon, elevation):
+        # so cria earth + Topos / busca o corpo na primeira vez de cada local / alvo
+        site = (lat, lon, elevation)
+        observer = self.observers.get(site)
+        body = self.bodies.get(target)
+
+        if observer is not None and body is not None:
+            self.geo_hits += 1
+            return observer, body
+
+        self.geo_rebuilds += 1
+        if observer is None:
+            observer = self.observer(lat, lon, elevation)
+        if body is None:
+            body = self.body(target)
+            self.bodies[target] = body
+
+        return observer, body
+
+    def observer(self, lat, lon, elevation):
+        site = (lat, lon, elevation)
+        observer = self.observers.get(site)
+        if observer is None:
+            from skyfield.api import Topos
+            observer = self.earth + Topos(
+                latitude_degrees=lat,
+                longitude_degrees=lon,
+                elevation_m=elevation
+            )
+            self.observers[site] = observer
+        return observer
+
+    def body(self, target):
+        # corpo do kernel (planetas, Lua, Sol), estrela/DSO do catalogo ou satelite
+        if self.catalog is not None and target in self.catalog:
+            return self.catalog.body(target)
+        if self.is_satellite(target):
+            return self.satellites.body(target)
+        return self.planets[target]
+
+    def is_satellite(self, target):
+        return self.satellites is not None and target in self.satellites
+
+    def satellite_vector(self, target, lat, lon, elevation):
+        key = (target, lat, lon, elevation)
+        vector = self.bodies.get(key)
+        if vector is None:
+            vector = self.bodies[key] = self.satellites.vector(target, lat, lon, elevation)
+        return vector
+
+    def compute_az_alt(self, t, key):
+        # aceita Time escalar ou vetor de tempos (ts.tt_jd(array))
+        target, lat, lon, elevation, temp, press = key
+        if self.is_satellite(target):
+            # satelite: SGP4 direto no referencial do observador
+            astrometric = self.satellite_vector(target, lat, lon, elevation).at(t)
+        else:
+            loc, body = self.geometry(target, lat, lon, elevation)
+            astrometric = loc.at(t).observe(body).apparent()
+
+        # refracao pela tabela do modelo de atmosfera (refeita so quando
+        # temperatura/pressao mudam), nao pela iteracao do Skyfield
+        alt, az, _ = astrometric.altaz()
+        atmosphere = refraction_model(temp, press)
+        if atmosphere is not None:
+            return az.degrees, atmosphere.apply(alt.degrees)
+        return az.degrees, alt.degrees
+
+# ================= Efemeride compartilhada =================
+# Um kernel, um worker de calculo e um cache de trajetoria por (alvo, local,
+# atmosfera) para todos os mounts do processo: mounts no mesmo alvo e local
+# usam a mesma trajetoria, cada mount a mais so interpola.
+TRAJ_IDLE_S = 900       # descarta trajetorias que nenhum mount usa ha 15 min
+
+class EphemerisService:
+    def __init__(self, ephemeris_path=None):
+        self.ephemeris_path = resource_path(ephemeris_path) if ephemeris_path else find_ephemeris()
+        self.ephemeris = None
+        self.ts = None
+        self.ready = threading.Event()
+        self.load_time = None
+
+        self.lock = threading.Lock()
+        self.trajectories = {}      # key → TrajectoryCache
+        self.trajectory_builds = 0
+        self.clients = {}           # id → TrackingEngine
+        self.next_id = 0
+
+        # === Worker de calculo (fora da UI e dos loops de TRACK) ===
+        self.compute_thread = ComputeWorker()
+        self.compute_thread.on_result = self.on_compute_result
+        self.compute_thread.on_failed = self.on_compute_failed
+        self.compute_thread.start()
+        self.compute_thread.submit("load", self.load_ephemeris)
+
+    def load_ephemeris(self):
+        t0 = time.perf_counter()
+        ephemeris = Ephemeris(self.ephemeris_path)
+        self.ts = ephemeris.ts
+        self.ephemeris = ephemeris
+        self.load_time = time.perf_counter() - t0
+        self.ready.set()
+        return self.load_time
+
+    def register(self, client):
+        with self.lock:
+            self.next_id += 1
+            client_id = self.next_id
+            self.clients[client_id] = client
+        # mount adicionado depois da carga: avisa mesmo assim
+        if self.ready.is_set():
+            self.submit(client_id, "load", lambda: self.load_time)
+        return client_id
+
+    def unregister(self, client_id):
+        with self.lock:
+            self.clients.pop(client_id, None)
+
+    def submit(self, client_id, tag, fn, *args):
+        self.compute_thread.submit((client_id, tag), fn, *args)
+
+    def trajectory(self, key):
+        with self.lock:
+            cache = self.trajectories.get(key)
+            if cache is None:
+                self.prune()
+                params = SAT_TRAJECTORY if self.ephemeris.is_satellite(key[0]) else {}
+                cache = TrajectoryCache(
+                    self.ts, self.compute_trajectory,
+                    submit=lambda fn, *args: self.compute_thread.submit(("trajectory", key), fn, *args),
+                    **params
+                )
+                self.trajectories[key] = cache
+            cache.last_used = time.monotonic()
+            return cache
+
+    def compute_trajectory(self, times, key):
+        self.trajectory_builds += 1
+        return self.ephemeris.compute_az_alt(times, key)
+
+    def prune(self):
+        now = time.monotonic()
+        for key, cache in list(self.trajectories.items()):
+            if now - cache.last_used > TRAJ_IDLE_S:
+                del self.trajectories[key]
+
+    def on_compute_result(self, tag, result):
+        if tag == "load":
+            for client in list(self.clients.values()):
+                client.on_compute_result("load", result)
+        elif tag[0] in self.clients:
+            self.clients[tag[0]].on_compute_result(tag[1], result)
+
+    def on_compute_failed(self, tag, msg):
+        if tag == "load":
+            for client in list(self.clients.values()):
+                client.on_compute_failed("load", msg)
+        elif tag[0] in self.clients:
+            self.clients[tag[0]].on_compute_failed(tag[1], msg)
+
+    def stop(self):
+        self.compute_thread.stop()
+        self.compute_thread.wait()
+
+# ================= Motor de rastreamento =================
+# Estado do observador/alvo, GOTO, loop de TRACK e serial. Nao depende de Qt:
+# a janela so muda os parametros e recebe os callbacks (de outras threads):
+#   on_log(msg, nivel, tipo), on_status(ok, msg), on_position(az, alt), on_ready(ok),
+#   on_catalog(tag, [(nome, tipo, mag, az, alt, separacao), ...]),
+#   on_plan(ordem, fora_do_plano), on_passes([passagem, ...])
+class TrackingEngine:
+    def __init__(self, ephemeris_path=None, service=None, name=None):
+        # === Skyfield (carregado em background, compartilhado entre mounts) ===
+        self.owns_service = service is None
+        self.service = service or EphemerisService(ephemeris_path)
+        self.ready = self.service.ready
+        self.name = name
+
+        # === Localização ===
+        self.latitude = DEFAULT_LATITUDE
+        self.longitude = DEFAULT_LONGITUDE
+        self.altitude = DEFAULT_ELEVATION
+
+        # === Alvo / atmosfera / tempo ===
+        self.target = TARGETS[0].lower()
+        self.temperature = 10.0     # °C; None = sem refracao
+        self.pressure = 1013.0      # mbar
+        self.manual_time = None     # datetime com fuso; None = agora
+        self.passes = []            # ultimas passagens de satelites calculadas
+        self.track_from_jd = None   # TRACK so comeca no inicio da passagem escolhida
+        self.clock = None           # clock(ts) → Time; relogio de replay (astro_sim.py)
+
+        # === Estado ===
+        self.tel_az = 0.0
+        self.tel_alt = 0.0
+        self.mech_az = 0.0          # az desenrolado desde o ZERO (enrolamento do cabo)
+        self.slew_safe_alt = SLEW_SAFE_ALT
+        self.slew_thread = None
+        self.slew_stop = threading.Event()
+        self.tracking = False
+        self.lookahead = False
+        self.feedback_enabled = False
+        self.telemetry = False
+        self.last_schedule = None
+        self.feedback = PositionFeedback()
+        self.pointing = PointingModel()     # ceu → mount (astro_pointing.py)
+        self.pointing_path = None           # salva a cada ajuste se definido
+        self.last_feedback_query = None
+        self.track_rate_hz = TRACK_RATE_HZ
+        self.scheduler = None       # TrackScheduler do TRACK atual (fica para o relatorio)
+        self.stamp = float("nan")  # instante (unix) da efemeride do tick atual
+        self.late_ms = 0.0          # atraso do tick atual
+
+        # === Serial ===
+        self.link = None
+        self.connected = False
+        self.acks = 0
+        self.firmware_version = None    # resposta do VER (None = firmware antigo)
+        self.rate_cmd = b'T'            # 'U' (microdeg/s) se o firmware aceitar
+        self.quantizer = RateQuantizer()
+
+        # === Gravacao de telemetria (astro_telemetry.py) ===
+        self.recorder = None
+
+        # === Callbacks ===
+        self.on_log = LogBuffer(sink=print_line).add   # terminal; a janela troca pelo dela
+        self.on_status = None
+        self.on_position = None
+        self.on_ready = None
+        self.on_catalog = None
+        self.on_plan = None
+        self.on_passes = None
+
+        # === Calculos vao para o worker do servico; respostas em on_compute_result ===
+        self.client_id = self.service.register(self)
+
+    def submit(self, tag, fn, *args):
+        self.service.submit(self.client_id, tag, fn, *args)
+
+    def wait_ready(self, timeout=None):
+        return self.ready.wait(timeout)
+
+    def log(self, msg, level=INFO, key=None):
+        # key: tipo de mensagem repetitiva (limitada/agregada pelo LogBuffer)
+        if self.name:
+            msg = f"[{self.name}] {msg}"
+            key = key and (self.name, key)
+        emit(self.on_log, msg, level, key)
+
+    # ================= Serial =================
+    def connect(self, port, baud=DEFAULT_BAUD):
+        if self.link:
+            self.link.stop()
+
+        self.link = SerialLink(port, baud)
+        self.firmware_version = None
+        self.rate_cmd = b'T'
+        self.quantizer = RateQuantizer(RATE_SCALE[b'T'], 1.0 / self.track_rate_hz)
+        self.link.on_line = self.on_serial_data
+        self.link.on_status = self.on_serial_status
+        self.link.on_position = self.on_serial_position
+        self.link.on_ack = self.on_serial_ack
+        self.link.on_error = self.on_serial_error
+        self.link.start()
+
+    def negotiate_baud(self, baud):
+        # conecte na velocidade atual do Arduino, escolha a nova e negocie.
+        # So com cabo USB: pelo HC-05 o modulo continua na velocidade dele
+        if self.link:
+            self.link.request_baud(baud)
+            self.log(f"🔁 Negociando {baud} baud")
+
+    def on_serial_data(self, line):
+        parts = line.split()
+        if parts[:2] == ["OK", "VER"] and len(parts) > 2 and parts[2].isdigit():
+            self.set_firmware_version(int(parts[2]))
+        # limite por tipo de resposta ("OK GOTO", "OK STOP"...); erro sempre aparece
+        if parts[:1] == ["ERR"]:
+            self.log(f"📡 Arduino → {line}", WARNING)
+        else:
+            self.log(f"📡 Arduino → {line}", key="arduino " + " ".join(parts[:2]))
+
+    def set_firmware_version(self, version):
+        self.firmware_version = version
+        self.rate_cmd = b'U' if version >= FIRMWARE_HIRES else b'T'
+        self.quantizer = RateQuantizer(RATE_SCALE[self.rate_cmd], 1.0 / self.track_rate_hz)
+        unit = "microdeg/s" if self.rate_cmd == b'U' else "milideg/s"
+        self.log(f"🔢 Firmware v{version}: velocidades em {unit}")
+
+    def on_serial_position(self, az_steps, alt_steps):
+        self.set_tel_position(az_steps / AZ_STEPS_PER_DEG, alt_steps / ALT_STEPS_PER_DEG)
+        self.record(telemetry.POSITION, self.mech_az, self.tel_alt)
+
+        if self.tracking and self.feedback_enabled and self.ready.is_set():
+            key = self.get_track_key()
+            state = self.service.trajectory(key).state(self.get_time(), key)
+            if state is not None:
+                self.feedback.update(*self.to_mount(state[0], state[1]), self.tel_az, self.tel_alt)
+
+    def on_serial_ack(self, cmd):
+        # acks de TRACK chegam a 10 Hz: so conta
+        self.acks += 1
+        self.record(telemetry.ACK, cmd=ord(cmd[:1] or "?"))
+
+    def on_serial_error(self, code, cmd):
+        self.log(f"🔴 Arduino → erro {FRAME_ERRORS.get(code, code)} no frame '{cmd}'", ERROR, key="frame_error")
+        self.record(telemetry.ERROR, ord(cmd[:1] or "?"), cmd=code)
+
+    def set_telemetry(self, enabled):
+        self.telemetry = enabled
+        if self.link:
+            ms = TELEMETRY_MS if enabled else 0
+            self.link.send(f"TELEM {ms}\n")
+
+    def on_serial_status(self, ok, msg):
+        self.connected = ok
+        self.record(telemetry.STATUS, float(ok))
+        self.log(msg, INFO if ok else ERROR)
+        emit(self.on_status, ok, msg)
+
+        if ok:
+            # firmware antigo responde ERR SYNTAX e fica no frame 'T'
+            self.link.send("VER\n")
+        if ok and self.telemetry:
+            self.set_telemetry(True)
+
+    # ================= Astronomia =================
+    def set_target(self, name):
+        self.target = name.lower()
+        self.track_from_jd = None
+
+    def set_location(self, lat, lon, elevation):
+        self.latitude = lat
+        self.longitude = lon
+        self.altitude = elevation
+
+    def set_atmosphere(self, temp, press):
+        # None, None = sem refracao; fora da faixa valida: ValueError e nada muda
+        refraction_model(temp, press)
+        self.temperature = temp
+        self.pressure = press
+
+    def get_time(self):
+        if self.manual_time is not None:
+            return self.service.ts.from_datetime(self.manual_time)
+        if self.clock is not None:
+            return self.clock(self.service.ts)
+        return self.service.ts.now()
+
+    def get_track_key(self):
+        # tudo que muda a trajetoria do alvo; se mudar, o cache e refeito
+        return (
+            self.target,
+            self.latitude, self.longitude, self.altitude,
+            self.temperature, self.pressure
+        )
+
+    def get_az_alt(self):
+        return self.service.ephemeris.compute_az_alt(self.get_time(), self.get_track_key())
+
+    def request_az_alt(self, tag):
+        # calcula no ComputeWorker; resposta chega em on_compute_result
+        if not self.ready.is_set():
+            return False
+        self.submit(tag, self.service.ephemeris.compute_az_alt, self.get_time(), self.get_track_key())
+        return True
+
+    def on_compute_result(self, tag, result):
+        if tag == "display":
+            emit(self.on_position, float(result[0]), float(result[1]))
+        elif tag == "goto":
+            self.goto_position(*result)
+        elif tag == "sync":
+            self.on_sync_point(*result)
+        elif tag in ("visible", "nearest"):
+            emit(self.on_catalog, tag, result)
+        elif tag == "plan":
+            emit(self.on_plan, *result)
+        elif tag == "passes":
+            self.passes = result
+            emit(self.on_passes, result)
+        elif tag == "load":
+            eph = self.service.ephemeris
+            ts = self.service.ts
+            start, end = ts.tt_jd(eph.start_jd), ts.tt_jd(eph.end_jd)
+            self.log(
+                f"🪐 Efeméride {os.path.basename(eph.path)} carregada em {result:.2f} s "
+                f"({start.utc_strftime('%Y-%m-%d')} → {end.utc_strftime('%Y-%m-%d')})"
+            )
+            emit(self.on_ready, True)
+
+    def on_compute_failed(self, tag, msg):
+        self.log(f"⚠️ Erro de cálculo ({tag}): {msg}", WARNING, key="compute_error")
+        if tag == "load":
+            emit(self.on_ready, False)
+
+    # ================= Catalogo =================
+    def request_visible(self, min_alt=20.0, max_mag=None):
+        # tudo que esta acima de min_alt agora (uma chamada vetorizada)
+        if not self.ready.is_set() or self.service.ephemeris.catalog is None:
+            return False
+        self.submit(
+            "visible", self.catalog_visible, self.get_time(), self.get_track_key(), min_alt, max_mag
+        )
+        return True
+
+    def request_nearest(self, az, alt, count=5):
+        # objetos do catalogo mais proximos de uma direcao (ex. do telescopio)
+        if not self.ready.is_set() or self.service.ephemeris.catalog is None:
+            return False
+        self.submit(
+            "nearest", self.catalog_nearest, self.get_time(), self.get_track_key(), az, alt, count
+        )
+        return True
+
+    def catalog_visible(self, t, key, min_alt, max_mag):
+        _, lat, lon, elevation, temp, press = key
+        catalog = self.service.ephemeris.catalog
+        az, alt = catalog.altaz(self.service.ephemeris.observer(lat, lon, elevation), t, temp, press)
+        return [
+            (str(catalog.names[i]), str(catalog.kinds[i]), float(catalog.mag[i]),
+             float(az[i]), float(alt[i]), None)
+            for i in catalog.visible(az, alt, min_alt, max_mag)
+        ]
+
+    def catalog_nearest(self, t, key, az, alt, count):
+        _, lat, lon, elevation, temp, press = key
+        catalog = self.service.ephemeris.catalog
+        observer = self.service.ephemeris.observer(lat, lon, elevation)
+        ra, dec, _ = observer.at(t).from_altaz(alt_degrees=alt, az_degrees=az).radec()
+        idx, sep = catalog.nearest(ra.hours, dec.degrees, count)
+
+        obj_az, obj_alt = catalog.altaz(observer, t, temp, press)
+        return [
+            (str(catalog.names[i]), str(catalog.kinds[i]), float(catalog.mag[i]),
+             float(obj_az[i]), float(obj_alt[i]), float(s))
+            for i, s in zip(idx, sep)
+        ]
+
+    # ================= Planejamento =================
+    def request_plan(self, names, hours=10.0, min_alt=20.0):
+        # nascer/transito/ocaso e ordem de observacao a partir de agora
+        if not self.ready.is_set():
+            return False
+        start_jd = self.get_time().tt
+        names = list(dict.fromkeys(names))
+        self.submit("plan", self.plan_night, names, start_jd, start_jd + hours / 24.0, min_alt)
+        return True
+
+    def plan_night(self, names, start_jd, end_jd, min_alt):
+        from astro_planner import plan_night, observing_order
+
+        _, lat, lon, elevation, temp, press = self.get_track_key()
+        plans = plan_night(
+            names, (lat, lon, elevation, temp, press), start_jd, end_jd, min_alt,
+            ephemeris=self.service.ephemeris
+        )
+        return observing_order(plans, start_jd, self.tel_az, self.tel_alt)
+
+    # ================= Satelites =================
+    def request_passes(self, hours=24.0, min_alt=PASS_MIN_ALT):
+        # passagens de todos os satelites do TLE (uma chamada SGP4 vetorizada)
+        if not self.ready.is_set() or self.service.ephemeris.satellites is None:
+            return False
+        start_jd = self.get_time().tt
+        self.submit("passes", self.satellite_passes, start_jd, start_jd + hours / 24.0, min_alt)
+        return True
+
+    def satellite_passes(self, start_jd, end_jd, min_alt):
+        _, lat, lon, elevation, _, _ = self.get_track_key()
+        eph = self.service.ephemeris
+        return find_passes(eph.satellites, lat, lon, elevation, start_jd, end_jd, eph.ts, min_alt)
+
+    def next_pass(self):
+        # proxima passagem (ou a atual) do alvo selecionado
+        now = self.get_time().tt
+        for p in self.passes:
+            if p["name"].lower() == self.target and p["set"] > now:
+                return p
+        return None
+
+    def select_pass(self, p, goto=True):
+        # espera no ponto de entrada; o TRACK segue o perfil a partir dali
+        self.set_target(p["name"])
+        self.track_from_jd = p["rise"]
+        wait = (p["rise"] - self.get_time().tt) * 86400.0
+        self.log(
+            f"🛰️ {p['name']}: passagem em {wait / 60:.1f} min | "
+            f"AZ {p['rise_az']:.0f}° → {p['set_az']:.0f}° | max {p['max_alt']:.0f}°"
+        )
+        if goto:
+            # posicao de entrada no ComputeWorker; o GOTO sai em on_compute_result
+            self.submit("goto", self.pass_entry, p)
+
+    def pass_entry(self, p):
+        return self.service.ephemeris.compute_az_alt(self.service.ts.tt_jd(p["rise"]), self.get_track_key())
+
+    def pending_pass(self):
+        # passagem do alvo que ainda nao comecou (o GOTO vai para a entrada)
+        p = self.next_pass() if self.ready.is_set() else None
+        return p if p is not None and self.get_time().tt < p["rise"] else None
+
+    def goto_pass(self):
+        p = self.pending_pass()
+        if p is None:
+            return False
+        self.select_pass(p)
+        return True
+
+    # ================= Ações =================
+    def goto(self):
+        if self.goto_pass():
+            return
+        if not self.request_az_alt("goto"):
+            self.log("⏳ Efeméride ainda carregando, tente o GOTO em instantes")
+
+    def goto_position(self, az, alt):
+        # devolve a duracao prevista do slew (s); None se nao houve GOTO
+        if alt < -0.5:
+            self.log("🔴 Alvo abaixo do horizonte (refração ignorada)", WARNING)
+            return None
+        az, alt = self.to_mount(az, alt)
+
+        # caminho mais rapido dentro do enrolamento do cabo
+        waypoints, seconds = plan_slew(self.mech_az, self.tel_alt, az, alt, safe_alt=self.slew_safe_alt)
+        self.log(
+            f"🧭 Slew previsto {seconds:.1f} s | {len(waypoints)} waypoint(s) | "
+            f"cabo {waypoints[-1][0]:+.0f}°"
+        )
+
+        self.cancel_slew()
+        if len(waypoints) > 1:
+            # Event novo por slew: o cancelamento do anterior nao vaza para este
+            self.slew_stop = threading.Event()
+            self.slew_thread = threading.Thread(
+                target=self.run_slew, args=(self.mech_az, self.tel_alt, waypoints, self.slew_stop),
+                daemon=True
+            )
+            self.slew_thread.start()
+        else:
+            self.send_goto(*waypoints[0])
+
+        self.set_tel_position(*waypoints[-1])
+        return seconds + SLEW_SETTLE_S * len(waypoints)
+
+    def send_goto(self, mech_az, alt):
+        cmd = f"GOTO AZ={mech_az:.2f} ALT={alt:.2f}\n"
+        if self.link:
+            self.link.send(cmd)
+        self.record(telemetry.GOTO, mech_az, alt)
+        self.log(f"🟡 {cmd.strip()}")
+
+    def run_slew(self, az, alt, waypoints, stop):
+        # manda o proximo waypoint quando o anterior deve ter chegado
+        for next_az, next_alt in waypoints:
+            if stop.is_set():
+                return
+            self.send_goto(next_az, next_alt)
+            wait = float(move_time(az, alt, next_az, next_alt)) + SLEW_SETTLE_S
+            if stop.wait(wait):
+                return
+            az, alt = next_az, next_alt
+
+    def cancel_slew(self):
+        self.slew_stop.set()
+
+    def set_tel_position(self, mech_az, alt):
+        self.mech_az = mech_az
+        self.tel_az = mech_az % 360
+        self.tel_alt = alt
+
+    def start_tracking(self):
+        if self.tracking:
+            return
+        self.tracking = True
+        self.cancel_slew()
+        self.reset_schedule()
+        self.reset_feedback()
+
+        self.quantizer.period = 1.0 / self.track_rate_hz
+        self.quantizer.reset()
+        self.scheduler = TrackScheduler(self.track_tick, self.track_rate_hz)
+        self.scheduler.start()
+        self.log(f"🟢 TRACK ativado ({self.track_rate_hz:g} Hz)")
+
+    def stop_tracking(self):
+        self.tracking = False
+        if self.scheduler and not self.scheduler.stop_event.is_set():
+            self.scheduler.stop()
+            self.log(f"⏱️ Agendador do TRACK: {self.scheduler.summary()}")
+            for line in self.scheduler.histogram_lines():
+                self.log(f"   {line}")
+        self.cancel_slew()
+
+        if self.link:
+            self.link.send("STOP\n")
+        self.log("🛑 TRACK desativado")
+
+    def set_track_rate(self, hz):
+        # vale no proximo TRACK; se estiver rodando, troca o agendador agora
+        self.track_rate_hz = hz
+        self.quantizer.period = 1.0 / hz
+        if self.tracking and self.scheduler:
+            self.scheduler.stop()
+            self.scheduler = TrackScheduler(self.track_tick, hz)
+            self.scheduler.start()
+            self.log(f"⏱️ TRACK a {hz:g} Hz")
+
+    def track_tick(self, late):
+        try:
+            self.track_target(late)
+        except Exception as e:
+            self.log(f"⚠️ Erro no TRACK: {e}", WARNING, key="track_error")
+
+    def track_target(self, late=0.0):
+        if not self.link or not self.tracking or not self.ready.is_set():
+            return
+
+        # posicao e velocidade angular (graus por segundo) vem do cache; os
+        # registros do tick levam o instante da efemeride usado no calculo
+        t = self.get_time()
+        self.stamp = t.utc_datetime().timestamp() if self.recorder is not None else float("nan")
+        self.late_ms = late * 1000.0
+        key = self.get_track_key()
+        cache = self.service.trajectory(key)
+        state = cache.state(t, key)
+        if state is None:
+            if cache.error is not None:
+                # alvo fora da efemeride, nome desconhecido...: avisa uma vez
+                self.log(f"🔴 Trajetória de {self.target} falhou: {cache.error} | TRACK parado", ERROR)
+                self.stop_tracking()
+            return
+        az, alt, vaz, valt = state
+        self.record(telemetry.TARGET, az, alt, vaz, valt, sky=self.stamp)
+
+        if alt < 1.0:
+            return
+        if self.track_from_jd is not None and t.tt < self.track_from_jd:
+            return
+        if self.pointing:
+            vaz, valt = self.pointing.apply_rates(az, alt, vaz, valt)
+            az, alt = self.pointing.apply(az, alt)
+
+        # sem telemetria, a melhor estimativa do mount e o proprio alvo
+        if not self.telemetry:
+            self.set_tel_position(self.mech_az + (az - self.mech_az + 180) % 360 - 180, alt)
+        if abs(self.mech_az) > AZ_WRAP_DEG:
+            self.log("🔴 Limite do cabo atingido: TRACK parado (um GOTO desenrola)", ERROR)
+            self.stop_tracking()
+            return
+
+        if self.feedback_enabled:
+            self.query_position()
+            vaz, valt = self.feedback.apply(vaz, valt)
+
+        if self.lookahead:
+            self.track_schedule(t, key, state)
+            return
+
+        # manda mesmo velocidades minusculas: o sigma-delta precisa de cada
+        # tick para que a media de um eixo lento nao vire zero
+        self.send_track_binary(vaz, valt)
+
+    def track_schedule(self, t, key, state):
+        # manda uma agenda de SEG_MAX segmentos a cada SEG_PUSH_S; o Arduino
+        # segue a curva sozinho entre um envio e outro
+        now = time.monotonic()
+        if self.last_schedule is not None and now - self.last_schedule < SEG_PUSH_S:
+            return
+
+        segments = self.service.trajectory(key).segments(t, key, SEG_MAX, SEG_DT_S)
+        if segments is None:
+            return
+
+        if self.pointing:
+            segments = self.pointing.apply_segments(state[0], state[1], segments)
+        if self.feedback_enabled:
+            segments = [(off, *self.feedback.apply(vaz, valt)) for off, vaz, valt in segments]
+
+        self.send_track_schedule(segments)
+        self.last_schedule = now
+
+    def set_lookahead(self, enabled):
+        self.lookahead = enabled
+        self.reset_schedule()
+
+    def reset_schedule(self):
+        self.last_schedule = None
+
+    def set_feedback(self, enabled):
+        self.feedback_enabled = enabled
+        self.reset_feedback()
+
+    def query_position(self):
+        now = time.monotonic()
+        if self.last_feedback_query is not None and now - self.last_feedback_query < FEEDBACK_PERIOD_S:
+            return
+        self.last_feedback_query = now
+        self.link.send("POS\n")
+
+    def reset_feedback(self):
+        self.feedback.reset()
+        self.last_feedback_query = None
+
+    # ================= Modelo de apontamento =================
+    def to_mount(self, az, alt):
+        # posicao do ceu → posicao que o mount precisa ter
+        if self.pointing:
+            az, alt = self.pointing.apply(az, alt)
+            return float(az), float(alt)
+        return az, alt
+
+    def load_pointing(self, path):
+        self.pointing = PointingModel.load(path)
+        self.pointing_path = path
+        self.log(f"📐 Modelo de apontamento: {len(self.pointing.points)} pontos | {self.pointing.describe()}")
+
+    def jog(self, daz, dalt):
+        # pequeno GOTO relativo para centralizar o alvo antes do sync
+        if self.tracking:
+            self.log("⚠️ Desligue o TRACK para ajustar a posição", WARNING)
+            return
+        alt = max(ALT_MIN_DEG, min(ALT_MAX_DEG, self.tel_alt + dalt))
+        self.send_goto(self.mech_az + daz, alt)
+        self.set_tel_position(self.mech_az + daz, alt)
+
+    def add_sync_point(self):
+        # alvo centrado: ceu agora x onde o mount esta agora; o Skyfield roda
+        # no ComputeWorker e o ponto entra em on_compute_result
+        if not self.ready.is_set():
+            return False
+        self.submit("sync", self.sync_position, self.get_time(), self.get_track_key(), self.tel_az, self.tel_alt)
+        return True
+
+    def sync_position(self, t, key, mount_az, mount_alt):
+        az, alt = self.service.ephemeris.compute_az_alt(t, key)
+        return float(az), float(alt), mount_az, mount_alt
+
+    def on_sync_point(self, az, alt, mount_az, mount_alt):
+        self.pointing.add_point(az, alt, mount_az, mount_alt)
+        rms = self.pointing.fit()
+        self.log(
+            f"📐 Sync {len(self.pointing.points)}: ceu AZ {az:.2f}° ALT {alt:.2f}° | "
+            f"mount AZ {mount_az:.2f}° ALT {mount_alt:.2f}° | RMS {rms:.0f}\" | {self.pointing.describe()}"
+        )
+        if self.pointing_path:
+            self.pointing.save(self.pointing_path)
+
+    def clear_pointing(self):
+        self.pointing.clear()
+        if self.pointing_path:
+            self.pointing.save(self.pointing_path)
+        self.log("📐 Modelo de apontamento limpo")
+
+    def sync_zero(self):
+        self.cancel_slew()
+        self.set_tel_position(0.0, 0.0)
+        if self.link:
+            self.link.send("ZERO\n")
+        self.log("ZERO definido")
+
+    def send_track_binary(self, vaz, valt):
+        vaz, valt = self.quantizer.quantize(vaz, valt, time.monotonic())
+        self.link.send_frame(build_track_frame(vaz, valt, self.rate_cmd))
+        self.record(telemetry.RATE, vaz, valt, self.late_ms, sky=self.stamp)
+
+        self.log(
+            f"🟣 TRACK BIN → "
+            f"VAZ={vaz:+.6f} °/s | "
+            f"VALT={valt:+.6f} °/s",
+            DEBUG, key="track_bin"
+        )
+
+    def send_track_schedule(self, segments):
+        segments = self.quantizer.quantize_segments(segments, SEG_DT_S, time.monotonic())
+        self.link.send_frame(build_schedule_frame(segments, self.rate_cmd))
+        self.record(telemetry.SCHEDULE, segments[0][1], segments[0][2], len(segments), self.late_ms, sky=self.stamp)
+
+        self.log(
+            f"🟣 AGENDA BIN → {len(segments)} seg × {SEG_DT_S:.0f}s | "
+            f"VAZ={segments[0][1]:+.6f} °/s | "
+            f"VALT={segments[0][2]:+.6f} °/s",
+            DEBUG, key="schedule_bin"
+        )
+
+    # ================= Telemetria =================
+    def start_recording(self, path):
+        self.stop_recording()
+        self.recorder = telemetry.TelemetryRecorder(path)
+        self.recorder.start()
+        self.log(f"⏺️ Gravando telemetria em {path}")
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder:
+            recorder.stop()
+            recorder.wait()
+            self.log(f"⏹️ Telemetria: {recorder.records} registros, {recorder.bytes_written / 1024:.0f} KB")
+
+    def record(self, kind, a=0.0, b=0.0, c=0.0, d=0.0, cmd=0, sky=float("nan")):
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(kind, a, b, c, d, cmd, sky)
+
+    def shutdown(self):
+        self.tracking = False
+        if self.scheduler:
+            self.scheduler.stop()
+        self.cancel_slew()
+        self.stop_recording()
+        if self.owns_service:
+            self.service.stop()
+        else:
+            self.service.unregister(self.client_id)
+        if self.link:
+            self.link.stop()
+            self.link.wait()
+
+# ================= Varios mounts =================
+# Cada mount tem sua serial, estado, alvo e loop de TRACK; a efemeride, o
+# worker de calculo e as trajetorias sao do EphemerisService compartilhado.
+class MountManager:
+    def __init__(self, ephemeris_path=None):
+        self.service = EphemerisService(ephemeris_path)
+        self.mounts = {}            # nome → TrackingEngine
+        self.on_log = LogBuffer(sink=print_line).add   # um log para todos os mounts
+
+    def add(self, name, port=None, baud=DEFAULT_BAUD):
+        if name in self.mounts:
+            raise ValueError(f"mount '{name}' ja existe")
+        engine = TrackingEngine(service=self.service, name=name)
+        engine.on_log = self.on_log
+        self.mounts[name] = engine
+        if port:
+            engine.connect(port, baud)
+        return engine
+
+    def remove(self, name):
+        self.mounts.pop(name).shutdown()
+
+    def wait_ready(self, timeout=None):
+        return self.service.ready.wait(timeout)
+
+    def shutdown(self):
+        for engine in self.mounts.values():
+            engine.shutdown()
+        self.mounts.clear()
+        self.service.stop()
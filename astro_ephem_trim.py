@@ -0,0 +1,101 @@
+# RECORTE DO de421.bsp PARA PLACAS COM POUCA MEMORIA / DISCO
+# Copia so os segmentos dos alvos usados (e da Terra, onde esta o observador)
+# dentro de uma janela de datas, gerando um kernel SPK bem menor.
+#   python astro_ephem_trim.py de421.bsp de421_trim.bsp --start 2026-01-01 --years 10
+#   python astro_ephem_trim.py de421.bsp de421_trim.bsp --targets moon,mars
+# O astro_engine usa o de421_trim.bsp automaticamente se ele existir.
+# USO LIVRE :)
+
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+from jplephem.daf import DAF
+from jplephem.spk import SPK
+from jplephem.excerpter import write_excerpt
+from skyfield.jpllib import SpiceKernel
+from astro_engine import TARGETS, TRIMMED_EPHEMERIS
+
+UNIX_EPOCH_JD = 2440587.5
+
+# sempre necessarios: a Terra (observador) e os defletores que o
+# apparent() do Skyfield usa para a deflexao da luz
+REQUIRED_BODIES = ["earth", "sun", "jupiter barycenter", "saturn barycenter"]
+
+def date_jd(text):
+    d = datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return UNIX_EPOCH_JD + d.timestamp() / 86400.0
+
+def body_path(by_target, code):
+    # segmentos (centro, alvo) do corpo ate o baricentro do sistema solar (0)
+    path = set()
+    while code != 0:
+        if code not in by_target:
+            return None
+        path.add((by_target[code], code))
+        code = by_target[code]
+    return path
+
+def needed_segments(kernel, targets):
+    # alvo fora do kernel (ex. "mars": o de421 so tem o 4 MARS BARYCENTER) e
+    # pulado com aviso; sem os corpos obrigatorios o recorte nao serve
+    by_target = {s.target: s.center for s in kernel.segments}
+    needed = set()
+    for name in REQUIRED_BODIES:
+        path = body_path(by_target, kernel.decode(name))
+        if path is None:
+            raise KeyError(f"{name}: corpo obrigatorio fora do kernel")
+        needed |= path
+    for name in targets:
+        try:
+            path = body_path(by_target, kernel.decode(name))
+        except (KeyError, ValueError):
+            path = None
+        if path is None:
+            print(f"Aviso: {name} nao esta no kernel, pulado")
+            continue
+        needed |= path
+    return needed
+
+def trim(input_path, output_path, start_jd, end_jd, targets):
+    kernel = SpiceKernel(input_path)
+    needed = needed_segments(kernel, targets)
+    kernel.close()
+
+    with open(input_path, 'rb') as f:
+        spk = SPK(DAF(f))
+        summaries = [
+            summary for summary, segment in zip(spk.daf.summaries(), spk.segments)
+            if (segment.center, segment.target) in needed
+        ]
+        with open(output_path, 'w+b') as out:
+            write_excerpt(spk, out, start_jd, end_jd, summaries)
+
+    return needed
+
+def main():
+    parser = argparse.ArgumentParser(description="Recorta um kernel SPK para os alvos e datas usados")
+    parser.add_argument("input", nargs="?", default="de421.bsp")
+    parser.add_argument("output", nargs="?", default=TRIMMED_EPHEMERIS)
+    parser.add_argument("--start", default=datetime.now(timezone.utc).strftime("%Y-%m-%d"))
+    parser.add_argument("--years", type=float, default=10.0)
+    parser.add_argument("--targets", default=",".join(t.lower() for t in TARGETS),
+                        help="corpos separados por virgula (padrao: os do seletor)")
+    args = parser.parse_args()
+
+    start_jd = date_jd(args.start)
+    end_jd = start_jd + args.years * 365.25
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+
+    try:
+        needed = trim(args.input, args.output, start_jd, end_jd, targets)
+    except KeyError as e:
+        sys.exit(f"Erro: {e}")
+
+    before = os.path.getsize(args.input) / 1e6
+    after = os.path.getsize(args.output) / 1e6
+    print(f"{len(needed)} segmentos: {', '.join(f'{c}->{t}' for c, t in sorted(needed))}")
+    print(f"{args.input} {before:.1f} MB → {args.output} {after:.2f} MB")
+
+if __name__ == "__main__":
+    main()
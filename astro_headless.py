@@ -0,0 +1,210 @@
+# MODO HEADLESS (SEM JANELA) DO ASTROCONTROL
+# Roda o TrackingEngine do astro_engine.py sem PyQt6, ex. num Raspberry Pi junto ao mount.
+#   python astro_headless.py --target moon                               (so mostra a posicao)
+#   python astro_headless.py --port /dev/ttyUSB0 --target moon --goto --track
+#   python astro_headless.py --visible --min-alt 30                      (catalogo acima de 30°)
+#   python astro_headless.py --target "ISS (ZARYA)" --goto --track     (satellites.tle; espera a passagem)
+#   python astro_headless.py --mount norte=/dev/ttyUSB0 --mount sul=/dev/ttyUSB1:mars --track
+#   python astro_headless.py --simulate --target moon --goto --track     (mount simulado, astro_sim.py)
+#   python astro_headless.py --bench-mounts 8                            (CPU com 8 mounts simulados)
+#   python astro_headless.py --bench-link                                (benchmark do link serial)
+#   python astro_headless.py --bench-startup --max-seconds 3             (benchmark de partida)
+# USO LIVRE :)
+
+import time
+T_START = time.perf_counter()
+
+import argparse
+import sys
+from astro_engine import (
+    TrackingEngine, MountManager, DEFAULT_BAUD, TRACK_RATE_HZ,
+    DEFAULT_LATITUDE, DEFAULT_LONGITUDE, DEFAULT_ELEVATION
+)
+from astro_satellites import PASS_MIN_ALT
+
+T_IMPORTED = time.perf_counter()
+
+SHUTDOWN_FLUSH_S = 0.3      # deixa o STOP sair pela serial antes de fechar
+SLEW_MARGIN_S = 2.0         # folga sobre o slew previsto antes do TRACK (folga mecanica, serial)
+
+def memory_mb():
+    # pico de memoria residente (Linux: KB, macOS: bytes)
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    except ImportError:
+        return float("nan")
+
+def main():
+    parser = argparse.ArgumentParser(description="AstroControl sem interface grafica")
+    parser.add_argument("--port", help="porta serial do Arduino (sem porta: so calcula)")
+    parser.add_argument("--mount", action="append", metavar="NOME=PORTA[:ALVO]",
+                        help="varios mounts no mesmo processo (repetir a opcao)")
+    parser.add_argument("--simulate", action="store_true", help="usa o mount simulado (astro_sim.py) como porta")
+    parser.add_argument("--baud", type=int, default=DEFAULT_BAUD)
+    parser.add_argument("--target", default="moon", help="corpo do de421.bsp (ex. moon, mars) ou do catalog.csv (ex. vega, m13)")
+    parser.add_argument("--lat", type=float, default=DEFAULT_LATITUDE)
+    parser.add_argument("--lon", type=float, default=DEFAULT_LONGITUDE)
+    parser.add_argument("--elev", type=float, default=DEFAULT_ELEVATION)
+    parser.add_argument("--temp", type=float, default=10.0, help="°C")
+    parser.add_argument("--press", type=float, default=1013.0, help="mbar")
+    parser.add_argument("--no-refraction", action="store_true")
+    parser.add_argument("--ephemeris", help="kernel SPK (padrao: de421_trim.bsp se existir, senao de421.bsp)")
+    parser.add_argument("--goto", action="store_true", help="GOTO no alvo ao conectar")
+    parser.add_argument("--track", action="store_true", help="liga o TRACK ao conectar")
+    parser.add_argument("--safe-alt", type=float, default=0.0, help="nao gira em azimute abaixo dessa altitude")
+    parser.add_argument("--pointing", metavar="ARQUIVO.json", help="modelo de apontamento (astro_pointing.py)")
+    parser.add_argument("--track-hz", type=float, default=TRACK_RATE_HZ, help="frequencia do loop de TRACK")
+    parser.add_argument("--lookahead", action="store_true", help="agenda antecipada de velocidades")
+    parser.add_argument("--feedback", action="store_true", help="correcao por realimentacao (POS)")
+    parser.add_argument("--telemetry", action="store_true", help="telemetria binaria de posicao")
+    parser.add_argument("--record", metavar="ARQUIVO.astl", help="grava a telemetria (ver astro_telemetry.py)")
+    parser.add_argument("--visible", action="store_true", help="lista os objetos do catalogo visiveis agora")
+    parser.add_argument("--min-alt", type=float, default=20.0)
+    parser.add_argument("--passes", type=float, nargs="?", const=24.0, metavar="HORAS",
+                        help="passagens de satelites do satellites.tle nas proximas HORAS")
+    parser.add_argument("--bench-link", action="store_true")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--bench-startup", action="store_true")
+    parser.add_argument("--bench-mounts", type=int, metavar="N")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--max-seconds", type=float, help="falha o --bench-startup acima disso")
+    args = parser.parse_args()
+
+    if args.bench_link:
+        from astro_sim import bench_link
+        bench_link(args.port, args.baud, args.frames)
+        return
+
+    if args.bench_mounts:
+        from astro_sim import bench_mounts
+        bench_mounts(args.bench_mounts, args.seconds, args.ephemeris)
+        return
+
+    if args.bench_startup:
+        from astro_sim import bench_startup
+        print(f"{'import engine':>18}: {(T_IMPORTED - T_START) * 1000:8.1f} ms")
+        total = bench_startup(args.ephemeris)
+        if args.max_seconds is not None and total > args.max_seconds:
+            sys.exit(f"Partida lenta: {total:.2f} s > {args.max_seconds:.2f} s")
+        return
+
+    if args.simulate and not args.mount:
+        from astro_sim import MountSimulator
+        simulator = MountSimulator()
+        simulator.start()
+        args.port = simulator.port
+
+    # um mount (--port) ou varios (--mount nome=porta[:alvo]) com a efemeride compartilhada
+    manager = None
+    if args.mount:
+        manager = MountManager(args.ephemeris)
+        mounts = []
+        for spec in args.mount:
+            name, _, rest = spec.partition("=")
+            port, _, target = rest.partition(":")
+            mounts.append((manager.add(name), port, target or args.target))
+    else:
+        mounts = [(TrackingEngine(args.ephemeris), args.port, args.target)]
+
+    for engine, _, target in mounts:
+        engine.set_location(args.lat, args.lon, args.elev)
+        engine.set_target(target)
+        if args.no_refraction:
+            engine.set_atmosphere(None, None)
+        else:
+            try:
+                engine.set_atmosphere(args.temp, args.press)
+            except ValueError as e:
+                sys.exit(f"Atmosfera inválida: {e}")
+        engine.set_lookahead(args.lookahead)
+        engine.set_feedback(args.feedback)
+        engine.slew_safe_alt = args.safe_alt
+        engine.set_track_rate(args.track_hz)
+        if args.pointing:
+            engine.load_pointing(args.pointing)
+        engine.telemetry = args.telemetry
+        if args.record:
+            # varios mounts: um arquivo por mount (sessao_norte.astl, ...)
+            stem, dot, ext = args.record.rpartition(".")
+            path = f"{stem}_{engine.name}.{ext}" if manager and dot else args.record
+            engine.start_recording(path)
+
+    def shutdown():
+        if manager:
+            manager.shutdown()
+        else:
+            mounts[0][0].shutdown()
+
+    engine = mounts[0][0]
+    if not engine.wait_ready(60):
+        shutdown()
+        sys.exit("Efeméride nao carregou")
+
+    positions = []
+    for engine, _, target in mounts:
+        az, alt = engine.get_az_alt()
+        positions.append((az, alt))
+        engine.log(f"🔭 {target}: AZ {az:.2f}° | ALT {alt:.2f}°")
+    if args.visible:
+        rows = engine.catalog_visible(engine.get_time(), engine.get_track_key(), args.min_alt, None)
+        for name, kind, mag, obj_az, obj_alt, _ in rows:
+            print(f"{name:>16} {kind:>10} mag {mag:5.1f}  AZ {obj_az:6.1f}°  ALT {obj_alt:5.1f}°")
+    eph = engine.service.ephemeris
+    if eph.satellites is not None and (args.passes or any(eph.is_satellite(e.target) for e, _, _ in mounts)):
+        start_jd = engine.get_time().tt
+        passes = engine.satellite_passes(start_jd, start_jd + (args.passes or 24.0) / 24.0, PASS_MIN_ALT)
+        for e, _, _ in mounts:
+            e.passes = passes
+        if args.passes:
+            from astro_planner import format_jd
+            ts = engine.service.ts
+            for p in passes:
+                print(f"{p['name']:>24} {format_jd(ts, p['rise']):>6} → {format_jd(ts, p['set']):>6} "
+                      f"max {p['max_alt']:5.1f}°  AZ {p['rise_az']:5.0f}° → {p['set_az']:5.0f}°")
+    engine.log(f"⏱️ Partida em {time.perf_counter() - T_START:.2f} s | memoria {memory_mb():.0f} MB")
+
+    mounts = [(engine, port, pos) for (engine, port, _), pos in zip(mounts, positions) if port]
+    if not mounts:
+        shutdown()
+        return
+
+    for engine, port, _ in mounts:
+        engine.connect(port, args.baud)
+    for _ in range(50):
+        if all(engine.connected for engine, _, _ in mounts):
+            break
+        time.sleep(0.1)
+
+    # o primeiro frame de TRACK poe o firmware em runSpeed() e abandona o
+    # GOTO em curso: o TRACK so comeca depois do slew mais longo
+    slew = 0.0
+    if args.goto:
+        for engine, _, (az, alt) in mounts:
+            p = engine.pending_pass()
+            if p is not None:
+                engine.select_pass(p, goto=False)
+                az, alt = engine.pass_entry(p)
+            slew = max(slew, engine.goto_position(float(az), float(alt)) or 0.0)
+
+    try:
+        if args.track:
+            if slew:
+                engine.log(f"⏳ TRACK depois do slew ({slew + SLEW_MARGIN_S:.1f} s)")
+                time.sleep(slew + SLEW_MARGIN_S)
+            for engine, _, _ in mounts:
+                engine.start_tracking()
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        tracking = [engine for engine, _, _ in mounts if engine.tracking]
+        for engine in tracking:
+            engine.stop_tracking()
+        if tracking:
+            time.sleep(SHUTDOWN_FLUSH_S)
+    finally:
+        shutdown()
+
+if __name__ == "__main__":
+    main()
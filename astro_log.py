@@ -0,0 +1,107 @@
+# LOG DO ASTROCONTROL COM MEMORIA LIMITADA
+# Buffer circular (deque com maxlen) de linhas com nivel, limite por tipo de
+# mensagem (as de 10 Hz como "TRACK BIN" viram uma linha agregada por minuto)
+# e entrega em lotes: a janela busca as linhas novas poucas vezes por segundo
+# em vez de um append no QTextEdit por mensagem.
+# USO LIVRE :)
+
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+LEVEL_NAMES = {DEBUG: "Debug", INFO: "Info", WARNING: "Aviso", ERROR: "Erro"}
+
+LOG_MAX_LINES = 2000        # linhas guardadas (o resto sai do buffer)
+RATE_WINDOW_S = 60.0        # janela do limite por tipo
+RATE_BURST = 3              # linhas por tipo e janela antes de agregar
+
+class LogBuffer:
+    def __init__(self, maxlen=LOG_MAX_LINES, window=RATE_WINDOW_S, burst=RATE_BURST, sink=None):
+        self.lines = deque(maxlen=maxlen)   # (hora, nivel, texto)
+        self.new = deque(maxlen=maxlen)     # ainda nao entregues por drain()
+        self.window = window
+        self.burst = burst
+        self.sink = sink                    # sink(hora, nivel, texto) na hora (headless)
+        self.rates = {}                     # tipo → [inicio da janela, mostradas, suprimidas, ultima, nivel]
+        self.last_sweep = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, msg, level=INFO, key=None):
+        # chamado de qualquer thread
+        now = time.monotonic()
+        out = []
+        with self.lock:
+            if now - self.last_sweep >= 1.0:
+                self.last_sweep = now
+                out += self.sweep(now)
+
+            if key is not None:
+                rate = self.rates.get(key)
+                if rate is None or now - rate[0] >= self.window:
+                    if rate is not None and rate[2]:
+                        out.append(self.aggregate(rate))
+                    rate = self.rates[key] = [now, 0, 0, msg, level]
+                rate[3] = msg
+                if rate[1] >= self.burst:
+                    rate[2] += 1
+                    msg = None
+                else:
+                    rate[1] += 1
+
+            if msg is not None:
+                out.append((level, msg))
+            lines = [self.push(lvl, text) for lvl, text in out]
+            # dentro do lock: linhas de threads diferentes saem inteiras e em ordem
+            if self.sink:
+                for line in lines:
+                    self.sink(*line)
+
+    def aggregate(self, rate):
+        _, _, suppressed, last, level = rate
+        return level, f"{last} (+{suppressed} do mesmo tipo em {self.window:.0f} s)"
+
+    def sweep(self, now):
+        # fecha as janelas vencidas; as suprimidas viram uma linha
+        out = []
+        for key, rate in list(self.rates.items()):
+            if now - rate[0] >= self.window:
+                if rate[2]:
+                    out.append(self.aggregate(rate))
+                del self.rates[key]
+        return out
+
+    def push(self, level, text):
+        line = (datetime.now().strftime('%H:%M:%S'), level, text)
+        self.lines.append(line)
+        self.new.append(line)
+        return line
+
+    def drain(self, min_level=DEBUG):
+        # linhas novas desde a ultima chamada (a janela chama por QTimer)
+        with self.lock:
+            out = self.sweep(time.monotonic())
+            for level, text in out:
+                self.push(level, text)
+            new, self.new = self.new, deque(maxlen=self.new.maxlen)
+        return [line for line in new if line[1] >= min_level]
+
+    def snapshot(self, min_level=DEBUG):
+        # tudo que ainda esta no buffer (ao trocar o filtro de nivel)
+        with self.lock:
+            return [line for line in self.lines if line[1] >= min_level]
+
+def format_line(line):
+    stamp, _, text = line
+    return f"[{stamp}] {text}"
+
+def print_line(stamp, level, text):
+    # sink do modo headless / terminal; um write so (print separa texto e \n)
+    sys.stdout.write(f"[{stamp}] {text}\n")
+    sys.stdout.flush()
@@ -0,0 +1,226 @@
+# PLANEJADOR DA NOITE DE OBSERVACAO
+# Para uma lista de alvos e uma janela de tempo: nascer/transito/ocaso (almanac do
+# Skyfield), janelas acima da altitude minima (grade vetorizada de tempos) e uma
+# ordem de observacao que minimiza o tempo de slew com os limites do tracker3.0.ino.
+# Os alvos sao divididos entre processos (ProcessPoolExecutor).
+#   python astro_planner.py --targets moon,mars,vega,m13 --start "2026-03-01 21:00" --hours 8
+#   python astro_planner.py --catalog --min-alt 30           (todo o catalog.csv)
+# USO LIVRE :)
+
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import numpy as np
+from astro_engine import (
+    Ephemeris, find_ephemeris, slew_time, TARGETS,
+    DEFAULT_LATITUDE, DEFAULT_LONGITUDE, DEFAULT_ELEVATION
+)
+from astro_atmosphere import refraction_model
+
+PLAN_STEP_MIN = 5.0         # grade de tempos para alt/az e janelas
+PLAN_MIN_ALT = 20.0
+DWELL_MIN = 15.0            # tempo em cada alvo antes do proximo slew
+PARALLEL_MIN_TARGETS = 16   # abaixo disso o pool nao compensa a partida dos processos
+CHUNKS_PER_WORKER = 4
+
+_ephemeris = None           # um por processo (ver init_worker)
+
+# ================= Um alvo =================
+def above_windows(jd, alt, min_alt):
+    # intervalos (inicio, fim) com alt >= min_alt, bordas interpoladas na grade
+    above = alt >= min_alt
+    i = np.flatnonzero(np.diff(above.astype(np.int8)))
+    bounds = list(jd[i] + (min_alt - alt[i]) / (alt[i + 1] - alt[i]) * (jd[i + 1] - jd[i]))
+    if above[0]:
+        bounds.insert(0, jd[0])
+    if above[-1]:
+        bounds.append(jd[-1])
+    return [(float(s), float(e)) for s, e in zip(bounds[0::2], bounds[1::2])]
+
+def first_event(found):
+    # find_risings/find_settings: y False = so encosta no horizonte
+    t, y = found
+    jd = t.tt[y]
+    return float(jd[0]) if len(jd) else None
+
+def plan_target(ephemeris, name, site, times, min_alt):
+    from skyfield import almanac
+
+    lat, lon, elevation, temp, press = site
+    if ephemeris.is_satellite(name):
+        # LEO passa em minutos: a grade da noite nao serve (ver astro_satellites.find_passes)
+        return {"name": name, "error": "satélite: use as passagens"}
+    try:
+        observer = ephemeris.observer(lat, lon, elevation)
+        body = ephemeris.body(name)
+
+        # alt/az da noite inteira numa chamada (vetor de tempos)
+        apparent = observer.at(times).observe(body).apparent()
+        alt, az, _ = apparent.altaz()
+        alt = alt.degrees
+        atmosphere = refraction_model(temp, press)
+        if atmosphere is not None:
+            alt = atmosphere.apply(alt)
+
+        t0, t1 = times[0], times[-1]
+        transits = almanac.find_transits(observer, body, t0, t1)
+        rise = first_event(almanac.find_risings(observer, body, t0, t1))
+        setting = first_event(almanac.find_settings(observer, body, t0, t1))
+    except Exception as e:
+        # um alvo ruim (fora do kernel, sem dados) nao derruba o plano inteiro
+        return {"name": name, "error": str(e)}
+
+    return {
+        "name": name,
+        "rise": rise,
+        "transit": float(transits.tt[0]) if len(transits.tt) else None,
+        "set": setting,
+        "windows": above_windows(times.tt, alt, min_alt),
+        "max_alt": float(alt.max()),
+        "jd": times.tt,
+        "az": np.unwrap(az.degrees, period=360),
+        "alt": alt,
+    }
+
+def plan_targets(ephemeris, names, site, start_jd, end_jd, min_alt, step_min=PLAN_STEP_MIN):
+    n = max(2, int(np.ceil((end_jd - start_jd) * 1440.0 / step_min)) + 1)
+    times = ephemeris.ts.tt_jd(np.linspace(start_jd, end_jd, n))
+    return [plan_target(ephemeris, name, site, times, min_alt) for name in names]
+
+# ================= Pool de processos =================
+def init_worker(ephemeris_path):
+    # cada processo abre o kernel uma vez (mmap, barato) e reusa em todos os lotes
+    global _ephemeris
+    _ephemeris = Ephemeris(ephemeris_path)
+
+def plan_chunk(args):
+    return plan_targets(_ephemeris, *args)
+
+def plan_night(names, site, start_jd, end_jd, min_alt=PLAN_MIN_ALT,
+               ephemeris=None, ephemeris_path=None, workers=None, step_min=PLAN_STEP_MIN):
+    # site = (lat, lon, elevation, temp, press); resultado na ordem de names
+    workers = workers or os.cpu_count() or 1
+    ephemeris_path = ephemeris_path or (ephemeris.path if ephemeris else find_ephemeris())
+
+    if workers <= 1 or len(names) < PARALLEL_MIN_TARGETS:
+        ephemeris = ephemeris or Ephemeris(ephemeris_path)
+        return plan_targets(ephemeris, names, site, start_jd, end_jd, min_alt, step_min)
+
+    size = max(1, int(np.ceil(len(names) / (workers * CHUNKS_PER_WORKER))))
+    chunks = [
+        (names[i:i + size], site, start_jd, end_jd, min_alt, step_min)
+        for i in range(0, len(names), size)
+    ]
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(ephemeris_path,)) as pool:
+        return [plan for result in pool.map(plan_chunk, chunks) for plan in result]
+
+# ================= Ordem de observacao =================
+def position(plan, jd):
+    az = np.interp(jd, plan["jd"], plan["az"]) % 360
+    return float(az), float(np.interp(jd, plan["jd"], plan["alt"]))
+
+def observing_order(plans, start_jd, az=0.0, alt=0.0, dwell_min=DWELL_MIN):
+    # guloso: do alvo atual vai para o observavel com menor slew; se nenhum
+    # esta acima do minimo agora, espera a proxima janela que abrir
+    dwell = dwell_min / 1440.0
+    remaining = [p for p in plans if p.get("windows")]
+    order = []
+    t = start_jd
+
+    while remaining:
+        best = None
+        for plan in remaining:
+            slew = float(slew_time(az, alt, *position(plan, t)))
+            arrive = t + slew / 86400.0
+            if any(s <= arrive and arrive + dwell <= e for s, e in plan["windows"]) \
+                    and (best is None or slew < best[1]):
+                best = (plan, slew)
+
+        if best is None:
+            starts = [s for p in remaining for s, e in p["windows"] if s > t]
+            if not starts:
+                break
+            t = min(starts)
+            continue
+
+        plan, slew = best
+        t += slew / 86400.0
+        target_az, target_alt = position(plan, t)
+        order.append({"name": plan["name"], "start": t, "slew_s": slew, "az": target_az, "alt": target_alt})
+        remaining.remove(plan)
+
+        # o mount acompanha o alvo durante a exposicao
+        t += dwell
+        az, alt = position(plan, t)
+
+    skipped = [p["name"] for p in plans if p["name"] not in {o["name"] for o in order}]
+    return order, skipped
+
+def format_jd(ts, jd):
+    # horario local (HH:MM) de uma data juliana TT
+    if jd is None:
+        return "--:--"
+    return ts.tt_jd(jd).utc_datetime().astimezone().strftime("%H:%M")
+
+# ================= CLI =================
+def main():
+    parser = argparse.ArgumentParser(description="Planeja a noite de observacao")
+    parser.add_argument("--targets", default=",".join(TARGETS), help="alvos separados por virgula")
+    parser.add_argument("--catalog", action="store_true", help="inclui todos os objetos do catalog.csv")
+    parser.add_argument("--start", help="inicio local 'AAAA-MM-DD HH:MM' (padrao: agora)")
+    parser.add_argument("--hours", type=float, default=10.0)
+    parser.add_argument("--min-alt", type=float, default=PLAN_MIN_ALT)
+    parser.add_argument("--dwell", type=float, default=DWELL_MIN, help="minutos em cada alvo")
+    parser.add_argument("--az", type=float, default=0.0, help="posicao inicial do mount")
+    parser.add_argument("--alt", type=float, default=0.0)
+    parser.add_argument("--lat", type=float, default=DEFAULT_LATITUDE)
+    parser.add_argument("--lon", type=float, default=DEFAULT_LONGITUDE)
+    parser.add_argument("--elev", type=float, default=DEFAULT_ELEVATION)
+    parser.add_argument("--temp", type=float, default=10.0, help="°C")
+    parser.add_argument("--press", type=float, default=1013.0, help="mbar")
+    parser.add_argument("--ephemeris", help="kernel SPK (padrao: de421_trim.bsp se existir, senao de421.bsp)")
+    parser.add_argument("--workers", type=int, help="processos (padrao: numero de CPUs)")
+    args = parser.parse_args()
+
+    ephemeris = Ephemeris(args.ephemeris or find_ephemeris())
+    ts = ephemeris.ts
+
+    names = [n.strip().lower() for n in args.targets.split(",") if n.strip()]
+    if args.catalog and ephemeris.catalog is not None:
+        names += [str(n).lower() for n in ephemeris.catalog.names]
+    names = list(dict.fromkeys(names))     # --targets vega --catalog: Vega uma vez so
+
+    start = datetime.strptime(args.start, "%Y-%m-%d %H:%M") if args.start else datetime.now()
+    start = start.astimezone()
+    start_jd = ts.from_datetime(start).tt
+    end_jd = ts.from_datetime(start + timedelta(hours=args.hours)).tt
+    site = (args.lat, args.lon, args.elev, args.temp, args.press)
+
+    t = time.perf_counter()
+    plans = plan_night(names, site, start_jd, end_jd, args.min_alt,
+                       ephemeris=ephemeris, workers=args.workers)
+    elapsed = time.perf_counter() - t
+
+    print(f"{'alvo':>20} {'nasce':>6} {'transito':>8} {'poe':>6} {'alt max':>8}")
+    for plan in plans:
+        if "error" in plan:
+            print(f"{plan['name']:>20}  erro: {plan['error']}")
+            continue
+        print(f"{plan['name']:>20} {format_jd(ts, plan['rise']):>6} {format_jd(ts, plan['transit']):>8} "
+              f"{format_jd(ts, plan['set']):>6} {plan['max_alt']:7.1f}°")
+
+    order, skipped = observing_order(plans, start_jd, args.az, args.alt, args.dwell)
+    print(f"\nOrdem (acima de {args.min_alt:.0f}°, {args.dwell:.0f} min por alvo):")
+    for i, item in enumerate(order, 1):
+        print(f"{i:3d}. {format_jd(ts, item['start'])} {item['name']:>20}  "
+              f"slew {item['slew_s']:5.1f} s  AZ {item['az']:6.1f}°  ALT {item['alt']:5.1f}°")
+    if skipped:
+        print(f"Fora do plano: {', '.join(skipped)}")
+    print(f"\n{len(plans)} alvos planejados em {elapsed:.2f} s")
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
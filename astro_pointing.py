@@ -0,0 +1,170 @@
+# MODELO DE APONTAMENTO (ESTILO TPOINT) PARA MOUNT ALT-AZ
+# Cada ponto de sync guarda onde o alvo esta no ceu e onde o mount estava quando
+# o alvo ficou centrado. Os termos classicos de um alt-az sao ajustados por
+# minimos quadrados (NumPy lstsq) sobre a diferenca mount - ceu:
+#   IA, IE   indices (ZERO fora do norte / do nivel)
+#   CA       colimacao (tubo nao perpendicular ao eixo de altitude)
+#   NPAE     eixos de az e alt nao perpendiculares
+#   AN, AW   eixo de azimute inclinado para norte / oeste (mount fora do nivel)
+#   TF       flexao do tubo
+# A correcao vale em todo GOTO e nas velocidades do TRACK (posicao ceu → mount).
+#   python astro_pointing.py pointing_model.json           (termos e residuos)
+# USO LIVRE :)
+
+import argparse
+import json
+import numpy as np
+
+POINTING_FILE = 'pointing_model.json'
+TERMS = ("IA", "IE", "CA", "NPAE", "AN", "AW", "TF")
+# termos por numero de pontos (2 equacoes por ponto; sobra grau de liberdade)
+TERMS_BY_POINTS = ((6, TERMS), (3, ("IA", "IE", "CA", "AN", "AW")), (1, ("IA", "IE")))
+ALT_LIMIT_DEG = 89.0        # sec/tan explodem no zenite
+RATE_STEP_S = 1.0           # passo da diferenca finita da correcao de velocidade
+
+def term_columns(az, alt, terms):
+    # (dA, dE) de cada termo com coeficiente 1°, TPOINT: mount = ceu + soma
+    a = np.radians(az)
+    e = np.radians(np.minimum(alt, ALT_LIMIT_DEG))
+    zero, one = np.zeros_like(a), np.ones_like(a)
+    sec, tan = 1 / np.cos(e), np.tan(e)
+    columns = {
+        "IA": (-one, zero),
+        "IE": (zero, one),
+        "CA": (-sec, zero),
+        "NPAE": (-tan, zero),
+        "AN": (-np.sin(a) * tan, -np.cos(a)),
+        "AW": (-np.cos(a) * tan, np.sin(a)),
+        "TF": (zero, -np.cos(e)),
+    }
+    return (np.stack([columns[t][0] for t in terms], axis=-1),
+            np.stack([columns[t][1] for t in terms], axis=-1))
+
+class PointingModel:
+    def __init__(self, points=None, terms=(), coeffs=()):
+        self.points = list(points or [])    # [(ceu az, ceu alt, mount az, mount alt)]
+        self.set_coeffs(terms, coeffs)
+
+    def __bool__(self):
+        return bool(self.terms)
+
+    def set_coeffs(self, terms, coeffs):
+        self.terms = tuple(terms)
+        self.coeffs = np.array(coeffs, dtype=float)
+        # coeficientes soltos: a avaliacao por tick e so trigonometria escalar
+        c = dict(zip(self.terms, self.coeffs))
+        self.ia, self.ie, self.ca, self.npae, self.an, self.aw, self.tf = (float(c.get(t, 0.0)) for t in TERMS)
+
+    def add_point(self, sky_az, sky_alt, mount_az, mount_alt):
+        self.points.append((float(sky_az), float(sky_alt), float(mount_az) % 360, float(mount_alt)))
+
+    def clear(self):
+        self.points = []
+        self.set_coeffs((), ())
+
+    # === ajuste ===
+    def observed(self):
+        p = np.array(self.points, dtype=float).reshape(-1, 4)
+        d_az = (p[:, 2] - p[:, 0] + 180) % 360 - 180
+        return p[:, 0], p[:, 1], d_az, p[:, 3] - p[:, 1]
+
+    def fit(self, terms=None):
+        # RMS dos residuos no ceu (arcsec); az pesado por cos(alt)
+        if not self.points:
+            self.set_coeffs((), ())
+            return 0.0
+        if terms is None:
+            terms = next(t for n, t in TERMS_BY_POINTS if len(self.points) >= n)
+
+        az, alt, d_az, d_alt = self.observed()
+        m_az, m_alt = term_columns(az, alt, terms)
+        w = np.cos(np.radians(np.minimum(alt, ALT_LIMIT_DEG)))[:, None]
+        a = np.vstack((m_az * w, m_alt))
+        b = np.concatenate((d_az * w[:, 0], d_alt))
+        coeffs, *_ = np.linalg.lstsq(a, b, rcond=None)
+        self.set_coeffs(terms, coeffs)
+        return float(np.sqrt(np.mean(self.residuals() ** 2)))
+
+    def residuals(self):
+        # erro no ceu de cada ponto depois do modelo (arcsec)
+        az, alt, d_az, d_alt = self.observed()
+        m_az, m_alt = self.offsets(az, alt)
+        w = np.cos(np.radians(np.minimum(alt, ALT_LIMIT_DEG)))
+        return np.hypot((d_az - m_az) * w, d_alt - m_alt) * 3600
+
+    # === aplicacao (ceu → mount) ===
+    def offsets(self, az, alt):
+        # aceita escalares ou arrays
+        a = np.radians(az)
+        e = np.radians(np.minimum(alt, ALT_LIMIT_DEG))
+        sin_a, cos_a = np.sin(a), np.cos(a)
+        cos_e = np.cos(e)
+        tan_e = np.sin(e) / cos_e
+        d_az = -self.ia - self.ca / cos_e - self.npae * tan_e - (self.an * sin_a + self.aw * cos_a) * tan_e
+        d_alt = self.ie - self.an * cos_a + self.aw * sin_a - self.tf * cos_e
+        return d_az, d_alt
+
+    def apply(self, az, alt):
+        d_az, d_alt = self.offsets(az, alt)
+        return (az + d_az) % 360, alt + d_alt
+
+    def apply_rates(self, az, alt, vaz, valt, h=RATE_STEP_S):
+        # a correcao muda ao longo do caminho: soma a derivada dela ao longo
+        # do movimento (diferenca finita sobre h segundos)
+        d0 = self.offsets(az, alt)
+        d1 = self.offsets(az + vaz * h, alt + valt * h)
+        return vaz + (d1[0] - d0[0]) / h, valt + (d1[1] - d0[1]) / h
+
+    def apply_segments(self, az, alt, segments):
+        # agenda [(offset, vaz, valt)]: posicoes nas bordas dos segmentos
+        # (integrando as medias) e a correcao de cada trecho
+        if len(segments) < 2:
+            return [(off, *self.apply_rates(az, alt, vaz, valt)) for off, vaz, valt in segments]
+        off = np.array([s[0] for s in segments], dtype=float)
+        vaz = np.array([s[1] for s in segments])
+        valt = np.array([s[2] for s in segments])
+        dt = np.diff(np.append(off, 2 * off[-1] - off[-2]))
+        edges_az = az + np.concatenate(([0.0], np.cumsum(vaz * dt)))
+        edges_alt = alt + np.concatenate(([0.0], np.cumsum(valt * dt)))
+        d_az, d_alt = self.offsets(edges_az, edges_alt)
+        vaz = vaz + np.diff(d_az) / dt
+        valt = valt + np.diff(d_alt) / dt
+        return [(s[0], float(a), float(b)) for s, a, b in zip(segments, vaz, valt)]
+
+    # === arquivo ===
+    def save(self, path=POINTING_FILE):
+        with open(path, "w") as f:
+            json.dump({"points": self.points, "terms": self.terms, "coeffs": self.coeffs.tolist()}, f, indent=1)
+
+    @classmethod
+    def load(cls, path=POINTING_FILE):
+        with open(path) as f:
+            data = json.load(f)
+        return cls([tuple(p) for p in data.get("points", [])], data.get("terms", ()), data.get("coeffs", ()))
+
+    def describe(self):
+        return " | ".join(f"{t} {c * 3600:+.0f}\"" for t, c in zip(self.terms, self.coeffs)) or "sem termos"
+
+# ================= CLI =================
+def main():
+    parser = argparse.ArgumentParser(description="Modelo de apontamento do AstroControl")
+    parser.add_argument("path", nargs="?", default=POINTING_FILE)
+    parser.add_argument("--refit", action="store_true", help="reajusta com os pontos do arquivo e salva")
+    parser.add_argument("--terms", help="termos separados por virgula (padrao: pelo numero de pontos)")
+    args = parser.parse_args()
+
+    model = PointingModel.load(args.path)
+    if args.refit or args.terms:
+        terms = tuple(t.strip().upper() for t in args.terms.split(",")) if args.terms else None
+        model.fit(terms)
+        model.save(args.path)
+
+    print(f"{len(model.points)} pontos | {model.describe()}")
+    if model.points:
+        residuals = model.residuals()
+        for (sky_az, sky_alt, _, _), r in zip(model.points, residuals):
+            print(f"   AZ {sky_az:6.1f}° ALT {sky_alt:5.1f}°  residuo {r:6.0f}\"")
+        print(f"RMS {np.sqrt(np.mean(residuals ** 2)):.0f}\"")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# SATELITES ARTIFICIAIS (TLE) DO ASTROCONTROL
+# Carrega TLEs de um arquivo local (satellites.tle, formato de 2 ou 3 linhas do
+# Celestrak), procura as passagens de todos os satelites de uma vez com SGP4
+# vetorizado (SatrecArray: satelites x tempos numa chamada) e entrega os
+# EarthSatellite do Skyfield para o calculo fino do perfil de TRACK.
+#   python astro_satellites.py --update                     (baixa as estacoes do Celestrak)
+#   python astro_satellites.py --hours 24 --min-alt 10      (proximas passagens)
+# TLE envelhece: atualize a cada poucos dias, passagens com TLE velho erram minutos.
+# USO LIVRE :)
+
+import argparse
+import os
+import time
+import urllib.request
+from datetime import datetime, timezone
+import numpy as np
+
+TLE_FILE = 'satellites.tle'
+TLE_URL = 'https://celestrak.org/NORAD/elements/gp.php?GROUP=stations&FORMAT=tle'
+PASS_STEP_S = 20.0          # grade da busca de passagens (LEO fica minutos acima de 10°)
+PASS_MIN_ALT = 10.0
+
+def load_tle(path):
+    # [(nome, linha1, linha2)]; sem linha de nome, o nome e o numero NORAD
+    with open(path, encoding='utf-8') as f:
+        lines = [line.rstrip() for line in f if line.strip()]
+
+    out = []
+    name = line1 = None
+    for line in lines:
+        if line.startswith('1 ') and len(line) >= 64:
+            line1 = line
+        elif line.startswith('2 ') and line1:
+            out.append((name or line[2:7].strip(), line1, line))
+            name = line1 = None
+        else:
+            name = line[2:].strip() if line.startswith('0 ') else line.strip()
+    return out
+
+def download_tle(path=TLE_FILE, url=TLE_URL):
+    with urllib.request.urlopen(url, timeout=30) as response:
+        data = response.read()
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(load_tle(path))
+
+# ================= Catalogo de satelites =================
+class SatelliteCatalog:
+    def __init__(self, path, ts):
+        from skyfield.api import EarthSatellite
+        from sgp4.api import SatrecArray
+
+        self.path = path
+        self.sats = [EarthSatellite(l1, l2, name, ts) for name, l1, l2 in load_tle(path)]
+        self.names = [sat.name for sat in self.sats]
+        self.index = {}
+        for i, sat in enumerate(self.sats):
+            self.index[sat.name.lower()] = i
+            self.index.setdefault(str(sat.model.satnum), i)
+        self.array = SatrecArray([sat.model for sat in self.sats])
+        self.topos = {}             # (lat, lon, elev) → wgs84.latlon
+
+    def __len__(self):
+        return len(self.sats)
+
+    def __contains__(self, name):
+        return name.lower() in self.index
+
+    def body(self, name):
+        return self.sats[self.index[name.lower()]]
+
+    def site(self, lat, lon, elevation):
+        site = (lat, lon, elevation)
+        if site not in self.topos:
+            from skyfield.api import wgs84
+            self.topos[site] = wgs84.latlon(lat, lon, elevation_m=elevation)
+        return self.topos[site]
+
+    def vector(self, name, lat, lon, elevation):
+        # satelite - observador: vetor topocentrico (sem tempo de luz/aberracao,
+        # desprezíveis para LEO)
+        return self.body(name) - self.site(lat, lon, elevation)
+
+    def altaz_grid(self, jd_utc, lat, lon, elevation):
+        # (az, alt) de todos os satelites em todos os tempos: (satelites, tempos).
+        # TEME → terrestre so pela rotacao do GMST (sem movimento do polo e com
+        # UTC no lugar de UT1): erro bem abaixo de 0.1°, suficiente para achar
+        # passagens; o perfil de TRACK usa o Skyfield completo
+        from skyfield.sgp4lib import theta_GMST1982
+
+        whole = np.floor(jd_utc)
+        frac = jd_utc - whole
+        error, r, _ = self.array.sgp4(whole, frac)
+        theta, _ = theta_GMST1982(whole, frac)
+        c, s = np.cos(theta), np.sin(theta)
+        x = c * r[..., 0] + s * r[..., 1]
+        y = -s * r[..., 0] + c * r[..., 1]
+        z = r[..., 2]
+
+        ox, oy, oz = self.site(lat, lon, elevation).itrs_xyz.km
+        dx, dy, dz = x - ox, y - oy, z - oz
+        phi, lam = np.radians(lat), np.radians(lon)
+        east = -np.sin(lam) * dx + np.cos(lam) * dy
+        north = -np.sin(phi) * np.cos(lam) * dx - np.sin(phi) * np.sin(lam) * dy + np.cos(phi) * dz
+        up = np.cos(phi) * np.cos(lam) * dx + np.cos(phi) * np.sin(lam) * dy + np.sin(phi) * dz
+
+        alt = np.degrees(np.arctan2(up, np.hypot(east, north)))
+        az = np.degrees(np.arctan2(east, north)) % 360
+        alt[error != 0] = -90.0     # SGP4 falhou (TLE velho / decaido)
+        return az, alt
+
+# ================= Passagens =================
+def find_passes(catalog, lat, lon, elevation, start_jd, end_jd, ts,
+                min_alt=PASS_MIN_ALT, step_s=PASS_STEP_S):
+    # passagens acima de min_alt entre start_jd e end_jd (TT), por horario de
+    # inicio; bordas interpoladas na grade, pico por parabola nas 3 amostras
+    from astro_planner import above_windows
+
+    t0 = ts.tt_jd(start_jd)
+    jd0 = t0.utc_datetime().timestamp() / 86400.0 + 2440587.5     # UTC (unix) → JD
+    tt_minus_utc = start_jd - jd0
+
+    n = max(2, int((end_jd - start_jd) * 86400.0 / step_s) + 1)
+    jd_utc = jd0 + np.arange(n) * (step_s / 86400.0)
+    az, alt = catalog.altaz_grid(jd_utc, lat, lon, elevation)
+    jd = jd_utc + tt_minus_utc
+
+    passes = []
+    for i, name in enumerate(catalog.names):
+        windows = above_windows(jd, alt[i], min_alt)
+        if windows:
+            unwrapped = np.degrees(np.unwrap(np.radians(az[i])))
+        for rise, end in windows:
+            inside = np.flatnonzero((jd >= rise) & (jd <= end))
+            k = int(inside[np.argmax(alt[i][inside])]) if len(inside) else int(np.searchsorted(jd, rise))
+            peak, max_alt = float(jd[k]), float(alt[i][k])
+            if 0 < k < n - 1:
+                a, b, c = alt[i][k - 1:k + 2]
+                denom = a - 2 * b + c
+                if denom < 0:
+                    shift = 0.5 * (a - c) / denom
+                    peak += shift * step_s / 86400.0
+                    max_alt = float(b - 0.25 * (a - c) * shift)
+
+            passes.append({
+                "name": name,
+                "rise": rise,
+                "peak": peak,
+                "set": end,
+                "max_alt": max_alt,
+                "rise_az": float(np.interp(rise, jd, unwrapped)) % 360,
+                "peak_az": float(np.interp(peak, jd, unwrapped)) % 360,
+                "set_az": float(np.interp(end, jd, unwrapped)) % 360,
+            })
+
+    passes.sort(key=lambda p: p["rise"])
+    return passes
+
+# ================= CLI =================
+def main():
+    from skyfield.api import load
+    from astro_engine import DEFAULT_LATITUDE, DEFAULT_LONGITUDE, DEFAULT_ELEVATION
+    from astro_planner import format_jd
+
+    parser = argparse.ArgumentParser(description="Passagens de satelites (TLE)")
+    parser.add_argument("--tle", default=TLE_FILE)
+    parser.add_argument("--update", action="store_true", help=f"baixa {TLE_URL}")
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--min-alt", type=float, default=PASS_MIN_ALT)
+    parser.add_argument("--lat", type=float, default=DEFAULT_LATITUDE)
+    parser.add_argument("--lon", type=float, default=DEFAULT_LONGITUDE)
+    parser.add_argument("--elev", type=float, default=DEFAULT_ELEVATION)
+    args = parser.parse_args()
+
+    if args.update:
+        print(f"{download_tle(args.tle)} TLEs → {args.tle}")
+    if not os.path.exists(args.tle):
+        parser.error(f"{args.tle} nao existe (use --update)")
+
+    ts = load.timescale()
+    catalog = SatelliteCatalog(args.tle, ts)
+    start_jd = ts.from_datetime(datetime.now(timezone.utc)).tt
+
+    t = time.perf_counter()
+    passes = find_passes(catalog, args.lat, args.lon, args.elev, start_jd,
+                         start_jd + args.hours / 24.0, ts, args.min_alt)
+    elapsed = time.perf_counter() - t
+
+    print(f"{'satelite':>24} {'inicio':>6} {'pico':>6} {'fim':>6} {'alt max':>8}  AZ inicio → fim")
+    for p in passes:
+        print(f"{p['name']:>24} {format_jd(ts, p['rise']):>6} {format_jd(ts, p['peak']):>6} "
+              f"{format_jd(ts, p['set']):>6} {p['max_alt']:7.1f}°  {p['rise_az']:5.0f}° → {p['set_az']:5.0f}°")
+    print(f"\n{len(passes)} passagens de {len(catalog)} satelites em {elapsed:.2f} s")
+
+if __name__ == "__main__":
+    main()
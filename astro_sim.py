@@ -0,0 +1,673 @@
+# MOUNT SIMULADO (tracker3.0.ino EM SOFTWARE) E BANCADA DE REPLAY
+# O simulador abre um pty e responde como o Arduino: comandos de texto (GOTO,
+# TRACK, ZERO, STOP, POS, TELEM, BAUD, VER), frames 'T'/'S' e 'U'/'V' com checksum, acks 'A',
+# erros 'E' e telemetria 'P'. Os eixos imitam o AccelStepper (aceleracao no
+# GOTO, runSpeed no TRACK) e uma folga mecanica nas engrenagens.
+# A bancada liga um TrackingEngine no simulador com o tempo do ceu vindo de um
+# relogio de replay (data manual ou inicio de uma gravacao .astl) e mede o erro
+# de apontamento real (depois da folga) e a CPU. So Linux/macOS (pty).
+# Tambem ficam aqui as bancadas do link serial, da partida e de varios mounts
+# (chamadas pelo astro_headless.py), todas com o mesmo mount simulado.
+#   python astro_sim.py --serve                                  (porta para a janela/headless)
+#   python astro_sim.py --bench 60 --target moon --start "2026-03-01 22:00"
+#   python astro_sim.py --bench 60 --replay sessao.astl --lookahead --max-error 120
+#   python astro_sim.py --bench-rates 6 --target moon            (erro de quantizacao das velocidades)
+# USO LIVRE :)
+
+import argparse
+import math
+import os
+import select
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from astro_engine import (
+    TrackingEngine, MountManager, SerialLink, Ephemeris, FrameParser, RateQuantizer,
+    build_frame, build_track_frame, move_time, find_ephemeris, resource_path, TARGETS, DEFAULT_BAUD,
+    AZ_STEPS_PER_DEG, ALT_STEPS_PER_DEG, MAX_SPEED_STEPS, ACCEL_STEPS, AZ_WRAP_DEG,
+    ALT_MIN_DEG, ALT_MAX_DEG, RATE_SCALE, TRACK_RATE_HZ, FIRMWARE_HIRES, SEG_MAX, SEG_DT_S, SEG_PUSH_S,
+    DEFAULT_LATITUDE, DEFAULT_LONGITUDE, DEFAULT_ELEVATION
+)
+
+SIM_TICK_S = 0.002          # passo da simulacao (o loop() do UNO roda bem mais rapido)
+TRACK_MAX_STEPS = 200.0     # constrain(speed, -200, 200) do firmware
+BACKLASH_STEPS = 5          # folga mecanica simulada (igual a compensacao do firmware)
+PROTOCOL_VERSION = FIRMWARE_HIRES   # PROTOCOL_VERSION do firmware (resposta do VER)
+SAMPLE_S = 0.2              # amostragem do erro na bancada
+
+# ================= Eixo (AccelStepper) =================
+class SimAxis:
+    def __init__(self, backlash=BACKLASH_STEPS, max_speed=MAX_SPEED_STEPS, accel=ACCEL_STEPS):
+        self.backlash = backlash
+        self.max_speed = max_speed
+        self.accel = accel
+        self.set_current(0)
+
+    def set_current(self, steps):
+        # setCurrentPosition: para o motor e assume a posicao
+        self.pos = float(steps)     # posicao do motor (passos)
+        self.out = float(steps)     # posicao real do eixo, depois da folga
+        self.speed = 0.0
+        self.target = steps
+
+    def current(self):
+        return int(round(self.pos))
+
+    def running(self):
+        return self.speed != 0.0 or self.current() != self.target
+
+    def stop(self):
+        # stop() + moveTo(currentPosition()) do firmware
+        self.target = self.current()
+        self.speed = 0.0
+
+    def run(self, dt):
+        # run(): acelera ate max_speed e freia para parar no alvo
+        dist = self.target - self.pos
+        if abs(dist) < 0.5 and abs(self.speed) < self.accel * dt:
+            self.speed = 0.0
+            self.move(self.target)
+            return
+
+        direction = 1.0 if dist > 0 else -1.0
+        stopping = self.speed * self.speed / (2 * self.accel)
+        if self.speed * direction < 0 or stopping >= abs(dist):
+            self.speed -= math.copysign(self.accel * dt, self.speed)
+        else:
+            self.speed = max(-self.max_speed, min(self.max_speed, self.speed + direction * self.accel * dt))
+
+        new = self.pos + self.speed * dt
+        if (self.target - new) * direction < 0 and self.speed * direction > 0:
+            new, self.speed = float(self.target), 0.0
+        self.move(new)
+
+    def run_speed(self, speed, dt):
+        # runSpeed(): velocidade constante, sem rampa
+        speed = max(-self.max_speed, min(self.max_speed, speed))
+        self.move(self.pos + speed * dt)
+        self.target = self.current()
+
+    def move(self, pos):
+        self.pos = pos
+        # o eixo so acompanha depois de vencer a folga
+        if self.pos - self.out > self.backlash:
+            self.out = self.pos - self.backlash
+        elif self.out - self.pos > self.backlash:
+            self.out = self.pos + self.backlash
+
+# ================= Firmware =================
+class MountSimulator(threading.Thread):
+    def __init__(self, backlash=BACKLASH_STEPS, tick_s=SIM_TICK_S, baud=None):
+        super().__init__(daemon=True)
+        import pty
+        import tty
+
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.master)
+        self.port = os.ttyname(self.slave)
+        self.tick_s = tick_s
+        self.baud = baud                    # imita o tempo de transmissao (None = instantaneo)
+        self.running = True
+
+        self.az = SimAxis(backlash)
+        self.alt = SimAxis(backlash)
+        self.comp_steps = BACKLASH_STEPS    # BACKLASH_*_STEPS do firmware
+        self.tracking = False
+        self.speed_az = 0.0
+        self.speed_alt = 0.0
+        self.segments = []                  # [(offset ms, passos/s az, passos/s alt)]
+        self.seg_start = 0.0
+        self.telem_s = 0.0
+        self.last_telem = 0.0
+
+        self.parser = FrameParser()
+        self.frames = 0
+        self.cpu_s = 0.0                    # CPU da thread do simulador
+
+    # === serial ===
+    def wire_delay(self, size):
+        # 10 bits por byte (start + 8 + stop)
+        if self.baud:
+            time.sleep(size * 10.0 / self.baud)
+
+    def write(self, data):
+        self.wire_delay(len(data))
+        try:
+            os.write(self.master, data)
+        except OSError:
+            pass
+
+    def println(self, text):
+        self.write(text.encode() + b"\r\n")
+
+    def send_frame(self, cmd, payload):
+        self.write(build_frame(cmd, payload))
+
+    def send_position(self):
+        self.send_frame(b'P', self.az.current().to_bytes(4, 'little', signed=True) +
+                        self.alt.current().to_bytes(4, 'little', signed=True))
+
+    def run(self):
+        last = time.monotonic()
+        while self.running:
+            try:
+                ready, _, _ = select.select([self.master], [], [], self.tick_s)
+                if ready:
+                    bad = self.parser.bad_frames
+                    data = os.read(self.master, 1024)
+                    self.wire_delay(len(data))
+                    for kind, cmd, value in self.parser.feed(data):
+                        if kind == "frame":
+                            self.on_frame(cmd, value)
+                        else:
+                            self.on_command(value)
+                    if self.parser.bad_frames > bad:
+                        self.send_frame(b'E', bytes([1]) + b'?')
+            except OSError:
+                break
+
+            now = time.monotonic()
+            self.step(now, now - last)
+            last = now
+            self.cpu_s = time.thread_time()
+
+    def stop(self):
+        self.running = False
+
+    # === loop() ===
+    def step(self, now, dt):
+        if self.tracking:
+            if self.segments:
+                elapsed = (now - self.seg_start) * 1000
+                current = [s for s in self.segments if elapsed >= s[0]] or self.segments[:1]
+                self.speed_az, self.speed_alt = current[-1][1:]
+            self.az.run_speed(self.speed_az, dt)
+            self.alt.run_speed(self.speed_alt, dt)
+        else:
+            self.az.run(dt)
+            self.alt.run(dt)
+
+        if self.telem_s > 0 and now - self.last_telem >= self.telem_s:
+            self.last_telem = now
+            self.send_position()
+
+    # === parseCommand() ===
+    def on_command(self, cmd):
+        if cmd.startswith("GOTO"):
+            try:
+                az = float(cmd.split("AZ=")[1].split()[0])
+                alt = float(cmd.split("ALT=")[1].split()[0])
+            except (IndexError, ValueError):
+                self.println("ERR SYNTAX")
+                return
+            self.move_to(az, alt)
+            self.segments = []
+            self.tracking = False
+            self.println("OK GOTO")
+        elif cmd.startswith("TRACK"):
+            self.segments = []
+            try:
+                vaz = float(cmd.split("VAZ=")[1].split()[0])
+                valt = float(cmd.split("VALT=")[1].split()[0])
+            except (IndexError, ValueError):
+                self.println("ERR TRACK")
+                return
+            self.set_speeds(vaz * AZ_STEPS_PER_DEG, valt * ALT_STEPS_PER_DEG)
+            self.tracking = True
+            self.println("OK TRACK")
+        elif cmd.startswith("BAUD"):
+            try:
+                baud = int(cmd[5:])
+            except ValueError:
+                baud = 0
+            if baud < 9600:
+                self.println("ERR BAUD")
+                return
+            # responde na velocidade antiga e so entao troca
+            self.println("OK BAUD")
+            if self.baud:
+                self.baud = baud
+        elif cmd == "POS":
+            self.send_position()
+        elif cmd.startswith("TELEM"):
+            self.telem_s = int(cmd[6:] or 0) / 1000.0
+            self.println("OK TELEM")
+        elif cmd == "VER":
+            self.println(f"OK VER {PROTOCOL_VERSION}")
+        elif cmd == "ZERO":
+            self.az.set_current(0)
+            self.alt.set_current(0)
+            self.println("OK ZERO")
+        elif cmd == "STOP":
+            self.segments = []
+            self.speed_az = self.speed_alt = 0.0
+            self.az.stop()
+            self.alt.stop()
+            self.tracking = False
+            self.println("OK STOP")
+        else:
+            self.println("ERR SYNTAX")
+
+    def move_to(self, az, alt):
+        az = max(-AZ_WRAP_DEG, min(AZ_WRAP_DEG, az))
+        alt = max(ALT_MIN_DEG, min(ALT_MAX_DEG, alt))
+        # applyBacklash(): empurra alem do alvo na direcao do movimento
+        for axis, steps in ((self.az, int(az * AZ_STEPS_PER_DEG)), (self.alt, int(alt * ALT_STEPS_PER_DEG))):
+            if steps > axis.current():
+                steps += self.comp_steps
+            elif steps < axis.current():
+                steps -= self.comp_steps
+            axis.target = steps
+
+    def set_speeds(self, az_steps, alt_steps):
+        self.speed_az = max(-TRACK_MAX_STEPS, min(TRACK_MAX_STEPS, az_steps))
+        self.speed_alt = max(-TRACK_MAX_STEPS, min(TRACK_MAX_STEPS, alt_steps))
+
+    def on_frame(self, cmd, payload):
+        # readTrackFrame() / readScheduleFrame(); 'A' confirma
+        if cmd in ('T', 'U'):
+            scale = RATE_SCALE[cmd.encode()]
+            vaz = int.from_bytes(payload[0:4], 'little', signed=True) / scale
+            valt = int.from_bytes(payload[4:8], 'little', signed=True) / scale
+            self.set_speeds(vaz * AZ_STEPS_PER_DEG, valt * ALT_STEPS_PER_DEG)
+            self.segments = []
+        elif cmd in ('S', 'V'):
+            scale = RATE_SCALE[b'T' if cmd == 'S' else b'U']
+            segments = []
+            for i in range(payload[0]):
+                seg = payload[1 + i * 10:11 + i * 10]
+                vaz = int.from_bytes(seg[2:6], 'little', signed=True) / scale
+                valt = int.from_bytes(seg[6:10], 'little', signed=True) / scale
+                segments.append((
+                    int.from_bytes(seg[0:2], 'little'),
+                    max(-TRACK_MAX_STEPS, min(TRACK_MAX_STEPS, vaz * AZ_STEPS_PER_DEG)),
+                    max(-TRACK_MAX_STEPS, min(TRACK_MAX_STEPS, valt * ALT_STEPS_PER_DEG)),
+                ))
+            self.segments = segments
+            self.seg_start = time.monotonic()
+            self.speed_az, self.speed_alt = segments[0][1:]
+        else:
+            return
+        self.tracking = True
+        self.frames += 1
+        self.send_frame(b'A', cmd.encode())
+
+    # posicao real do tubo (depois da folga), em graus
+    def pointing(self):
+        return (self.az.out / AZ_STEPS_PER_DEG) % 360, self.alt.out / ALT_STEPS_PER_DEG
+
+    def moving(self):
+        return not self.tracking and (self.az.running() or self.alt.running())
+
+# ================= Relogio de replay =================
+# Tempo do ceu = inicio + tempo decorrido (x speed). Vai no engine.clock, que
+# substitui o relogio do sistema em get_time().
+class ReplayClock:
+    def __init__(self, start, speed=1.0):
+        self.start = start          # datetime com fuso
+        self.speed = speed
+        self.t0 = time.monotonic()
+
+    def __call__(self, ts):
+        return ts.from_datetime(self.start + timedelta(seconds=(time.monotonic() - self.t0) * self.speed))
+
+def replay_start(path):
+    # inicio de uma gravacao do astro_telemetry
+    from astro_telemetry import load_telemetry
+
+    records = load_telemetry(path)
+    if not len(records):
+        raise ValueError(f"{path}: gravacao vazia")
+    # instante da efemeride do primeiro tick (versao 2); senao o relogio
+    if "sky" in records.dtype.names and np.isfinite(records["sky"]).any():
+        sky = records["sky"][np.isfinite(records["sky"])]
+        return datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=float(sky[0]))
+    return datetime.fromtimestamp(float(records["t"][0]), timezone.utc)
+
+# ================= Bancada =================
+def separation(az1, alt1, az2, alt2):
+    # distancia no ceu (graus) entre duas posicoes alt/az
+    a1, a2 = math.radians(alt1), math.radians(alt2)
+    daz = math.radians(az1 - az2)
+    c = math.sin(a1) * math.sin(a2) + math.cos(a1) * math.cos(a2) * math.cos(daz)
+    return math.degrees(math.acos(max(-1.0, min(1.0, c))))
+
+def bench_tracking(seconds=60.0, target="moon", start=None, lookahead=False, feedback=False,
+                   telemetry=False, backlash=BACKLASH_STEPS, ephemeris_path=None, quiet=True):
+    sim = MountSimulator(backlash)
+    sim.start()
+
+    engine = TrackingEngine(ephemeris_path)
+    if quiet:
+        engine.on_log = None
+    if not engine.wait_ready(60):
+        raise RuntimeError("Efeméride nao carregou")
+
+    engine.clock = ReplayClock(start or datetime.now(timezone.utc))
+    engine.set_target(target)
+    engine.set_lookahead(lookahead)
+    engine.set_feedback(feedback)
+    engine.telemetry = telemetry or feedback
+    engine.connect(sim.port)
+    for _ in range(50):
+        if engine.connected:
+            break
+        time.sleep(0.1)
+
+    # GOTO e espera o slew (previsto + folga)
+    az, alt = engine.get_az_alt()
+    if alt < 1.0:
+        engine.shutdown()
+        sim.stop()
+        raise RuntimeError(f"{target} abaixo do horizonte ({alt:.1f}°)")
+    engine.goto_position(float(az), float(alt))
+    deadline = time.monotonic() + float(move_time(0, 0, engine.mech_az, alt)) + 5
+    time.sleep(0.2)
+    while sim.moving() and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    engine.start_tracking()
+    time.sleep(1.0)     # primeira trajetoria / agenda
+
+    errors = []
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    frames0, sim_cpu0 = sim.frames, sim.cpu_s
+    while time.perf_counter() - wall0 < seconds:
+        t = engine.get_time()
+        target_az, target_alt = engine.service.ephemeris.compute_az_alt(t, engine.get_track_key())
+        tel_az, tel_alt = sim.pointing()
+        errors.append(separation(float(target_az), float(target_alt), tel_az, tel_alt) * 3600)
+        time.sleep(SAMPLE_S)
+    cpu = time.process_time() - cpu0
+    wall = time.perf_counter() - wall0
+    frames = sim.frames - frames0
+    sim_cpu = sim.cpu_s - sim_cpu0
+
+    engine.stop_tracking()
+    engine.shutdown()
+    sim.stop()
+    sim.join(1)
+
+    errors.sort()
+    rms = math.sqrt(sum(e * e for e in errors) / len(errors))
+    return {
+        "samples": len(errors),
+        "rms_arcsec": rms,
+        "p95_arcsec": errors[int(0.95 * (len(errors) - 1))],
+        "max_arcsec": errors[-1],
+        "median_arcsec": errors[len(errors) // 2],
+        "cpu_percent": 100 * (cpu - sim_cpu) / wall,   # sem o simulador
+        "sim_cpu_percent": 100 * sim_cpu / wall,
+        "frames_per_s": frames / wall,
+    }
+
+# ================= Quantizacao das velocidades =================
+RATE_MODES = (
+    ("T truncado", RATE_SCALE[b'T'], None),     # int() antigo do build_track_frame
+    ("T arredondado", RATE_SCALE[b'T'], False),
+    ("T + dither", RATE_SCALE[b'T'], True),
+    ("U + dither", RATE_SCALE[b'U'], True),
+)
+
+def schedule_rates(az, alt, n, hz, quantize):
+    # velocidade em cada tick pelo caminho do look-ahead: SEG_MAX segmentos de
+    # SEG_DT_S a cada SEG_PUSH_S; a agenda nova corta a anterior no meio
+    seg = int(round(SEG_DT_S * hz))
+    push = int(round(SEG_PUSH_S * hz))
+    sent = np.empty((n, 2))
+    for p in range(0, n, push):
+        edges = p + np.arange(SEG_MAX + 1) * seg
+        rates = np.stack((np.diff(az[edges]), np.diff(alt[edges])), axis=1) / SEG_DT_S
+        segments = quantize([(i * SEG_DT_S, *r) for i, r in enumerate(rates.tolist())], p / hz)
+        for i, (_, vaz, valt) in enumerate(segments):
+            start, end = p + i * seg, min(p + (i + 1) * seg if i + 1 < len(segments) else n, p + push, n)
+            if start >= end:
+                break
+            sent[start:end] = (vaz, valt)
+    return sent
+
+def bench_rates(hours=6.0, target="moon", start=None, hz=TRACK_RATE_HZ, ephemeris_path=None):
+    # sem mount: integra a velocidade que cada modo de frame entrega ao firmware
+    # (runSpeed e exato) contra o caminho real do alvo; erro acumulado em arcsec.
+    # Mede os dois caminhos do TRACK: frame por tick e agenda do look-ahead
+    ephemeris = Ephemeris(ephemeris_path or find_ephemeris())
+    ts = ephemeris.ts
+    key = (target, DEFAULT_LATITUDE, DEFAULT_LONGITUDE, DEFAULT_ELEVATION, None, None)
+    t0 = ts.from_datetime(start or datetime.now(timezone.utc)).tt
+
+    dt = 1.0 / hz
+    n = int(hours * 3600 * hz)
+    extra = int(round(SEG_MAX * SEG_DT_S * hz))     # a ultima agenda olha adiante
+    az, alt = ephemeris.compute_az_alt(ts.tt_jd(t0 + np.arange(n + 1 + extra) * dt / 86400.0), key)
+    az = np.degrees(np.unwrap(np.radians(np.asarray(az, dtype=float))))
+    alt = np.asarray(alt, dtype=float)
+    # velocidade que o host pede em cada tick (media exata do tick)
+    wanted = np.stack((np.diff(az[:n + 1]), np.diff(alt[:n + 1])), axis=1) / dt
+
+    out = {}
+    for name, scale, dither in RATE_MODES:
+        if dither is None:
+            tick = np.trunc(wanted * scale) / scale
+            schedule = schedule_rates(az, alt, n, hz, lambda segs, now: [
+                (off, *(np.trunc(np.array(v) * scale) / scale)) for off, *v in segs])
+        else:
+            q = RateQuantizer(scale, dt, dither)
+            tick = np.array([q.quantize(v[0], v[1], k * dt) for k, v in enumerate(wanted.tolist())])
+            q = RateQuantizer(scale, dt, dither)
+            schedule = schedule_rates(az, alt, n, hz, lambda segs, now: q.quantize_segments(segs, SEG_DT_S, now))
+
+        for path, sent in (("tick", tick), ("agenda", schedule)):
+            drift = np.cumsum((sent - wanted) * dt, axis=0)
+            error = np.hypot(drift[:, 0] * np.cos(np.radians(alt[1:n + 1])), drift[:, 1]) * 3600
+            out[(path, name)] = {
+                "rms_arcsec": float(np.sqrt(np.mean(error ** 2))),
+                "max_arcsec": float(error.max()),
+                "final_arcsec": float(error[-1]),
+            }
+    return out
+
+# ================= Benchmark do link =================
+# python astro_headless.py --bench-link [--port COM5] [--baud 9600] [--frames 300]
+# Sem --port usa o mount simulado imitando o tempo de transmissao do baud.
+def bench_link(port, baud, frames):
+    import queue
+
+    sim = None
+    if port is None:
+        sim = MountSimulator(baud=baud)
+        sim.start()
+        port = sim.port
+        print(f"Arduino simulado em {port}")
+
+    worker = SerialLink(port, baud)
+    acks = queue.Queue()
+    opened = threading.Event()
+    worker.on_ack = lambda cmd: acks.put(time.perf_counter())
+    worker.on_status = lambda ok, msg: (print(msg), opened.set())
+    worker.start()
+    opened.wait(5)
+
+    # latencia: um frame por vez, espera o ack
+    latency = []
+    for i in range(frames):
+        t = time.perf_counter()
+        worker.send_frame(build_track_frame(0.001 * (i % 100), -0.002))
+        try:
+            latency.append(acks.get(timeout=1.0) - t)
+        except queue.Empty:
+            pass
+
+    # vazao: mantem sempre um TRACK na fila por alguns segundos
+    while not acks.empty():
+        acks.get()
+    duration = 3.0
+    t0 = time.perf_counter()
+    sent = worker.bytes_sent
+    while time.perf_counter() - t0 < duration:
+        if worker.out_track is None:
+            worker.send_frame(build_track_frame(0.001, -0.002))
+        time.sleep(0.0005)
+    time.sleep(0.1)
+    acked = acks.qsize()
+    tx = worker.bytes_sent - sent
+
+    worker.stop()
+    worker.wait()
+    if sim:
+        sim.stop()
+
+    if latency:
+        latency.sort()
+        ms = [1000 * latency[int(q * (len(latency) - 1))] for q in (0.5, 0.95, 0.99)]
+        print(f"Latencia ida e volta ({len(latency)}/{frames} acks): "
+              f"p50 {ms[0]:.2f} ms | p95 {ms[1]:.2f} ms | p99 {ms[2]:.2f} ms")
+    else:
+        print("Nenhum ack recebido (firmware sem frames 'A'?)")
+    print(f"Vazao sustentada: {acked / duration:.1f} frames/s | {tx / duration:.0f} B/s @ {baud} baud")
+
+# ================= Benchmark de partida =================
+# python astro_headless.py --bench-startup [--max-seconds 3]
+# Mede cada etapa da partida a frio para pegar regressoes.
+def bench_startup(ephemeris_path=None):
+    steps = []
+    t0 = time.perf_counter()
+
+    import skyfield.api  # noqa: F401
+    steps.append(("import skyfield", time.perf_counter() - t0))
+
+    ephemeris = Ephemeris(resource_path(ephemeris_path) if ephemeris_path else find_ephemeris())
+    steps += ephemeris.timings
+
+    t = time.perf_counter()
+    key = (TARGETS[1].lower(), DEFAULT_LATITUDE, DEFAULT_LONGITUDE, DEFAULT_ELEVATION, 10.0, 1013.0)
+    ephemeris.compute_az_alt(ephemeris.ts.now(), key)
+    steps.append(("primeira posicao", time.perf_counter() - t))
+
+    for name, dt in steps:
+        print(f"{name:>18}: {dt * 1000:8.1f} ms")
+    total = time.perf_counter() - t0
+    print(f"{'total':>18}: {total * 1000:8.1f} ms")
+    return total
+
+# ================= Benchmark de varios mounts =================
+# python astro_headless.py --bench-mounts 8 [--seconds 5]
+# N mounts simulados rastreando o mesmo alvo: a CPU por mount a mais deve
+# ser so a do loop de TRACK, a trajetoria e calculada uma vez. A CPU dos
+# simuladores fica de fora.
+def bench_mounts(count, seconds=5.0, ephemeris_path=None):
+    manager = MountManager(ephemeris_path)
+    manager.on_log = None
+    if not manager.wait_ready(60):
+        print("Efeméride nao carregou")
+        manager.shutdown()
+        return
+
+    # alvo mais alto agora (o TRACK so anda acima do horizonte)
+    eph = manager.service.ephemeris
+    t = manager.service.ts.now()
+    best = None
+    for target in TARGETS:
+        key = (target.lower(), DEFAULT_LATITUDE, DEFAULT_LONGITUDE, DEFAULT_ELEVATION, 10.0, 1013.0)
+        try:
+            alt = float(eph.compute_az_alt(t, key)[1])
+        except (KeyError, ValueError):
+            continue
+        if best is None or alt > best[1]:
+            best = (target, alt)
+
+    sims = []
+    for i in range(count):
+        sim = MountSimulator(baud=DEFAULT_BAUD)
+        sim.start()
+        sims.append(sim)
+        engine = manager.add(f"mount{i + 1}", sim.port)
+        engine.set_target(best[0])
+    time.sleep(1.0)
+
+    for engine in manager.mounts.values():
+        engine.start_tracking()
+    time.sleep(1.0)     # primeira trajetoria
+
+    builds = manager.service.trajectory_builds
+    frames0 = sum(sim.frames for sim in sims)
+    sim_cpu0 = sum(sim.cpu_s for sim in sims)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    time.sleep(seconds)
+    cpu = time.process_time() - cpu0
+    wall = time.perf_counter() - wall0
+    frames = sum(sim.frames for sim in sims) - frames0
+    cpu -= sum(sim.cpu_s for sim in sims) - sim_cpu0
+
+    print(f"{count} mount(s) em {best[0]} (ALT {best[1]:.1f}°): "
+          f"CPU {100 * cpu / wall:.1f}% | {frames / wall:.0f} frames TRACK/s | "
+          f"trajetorias calculadas {manager.service.trajectory_builds - builds} "
+          f"({len(manager.service.trajectories)} em cache)")
+    manager.shutdown()
+    for sim in sims:
+        sim.stop()
+    return cpu / wall
+
+# ================= CLI =================
+def main():
+    parser = argparse.ArgumentParser(description="Mount simulado e bancada de rastreamento")
+    parser.add_argument("--serve", action="store_true", help="so roda o simulador e mostra a porta")
+    parser.add_argument("--bench", type=float, metavar="SEGUNDOS")
+    parser.add_argument("--target", default="moon")
+    parser.add_argument("--start", help="tempo do ceu 'AAAA-MM-DD HH:MM' (UTC)")
+    parser.add_argument("--replay", metavar="ARQUIVO.astl", help="comeca no inicio da gravacao")
+    parser.add_argument("--lookahead", action="store_true")
+    parser.add_argument("--feedback", action="store_true")
+    parser.add_argument("--backlash", type=int, default=BACKLASH_STEPS, help="folga simulada (passos)")
+    parser.add_argument("--ephemeris")
+    parser.add_argument("--max-error", type=float, help="falha se o erro RMS passar disso (arcsec)")
+    parser.add_argument("--bench-rates", type=float, metavar="HORAS",
+                        help="erro acumulado de cada modo de quantizacao das velocidades")
+    args = parser.parse_args()
+
+    if args.serve:
+        sim = MountSimulator(args.backlash)
+        sim.start()
+        print(f"Mount simulado em {sim.port} (Ctrl+C para sair)")
+        try:
+            while True:
+                time.sleep(1)
+                az, alt = sim.pointing()
+                print(f"\rAZ {az:8.3f}° ALT {alt:7.3f}° | TRACK {'on ' if sim.tracking else 'off'} "
+                      f"| frames {sim.frames}", end="", flush=True)
+        except KeyboardInterrupt:
+            print()
+        return
+
+    if args.replay:
+        start = replay_start(args.replay)
+    elif args.start:
+        start = datetime.strptime(args.start, "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
+    else:
+        start = None
+
+    if args.bench_rates:
+        r = bench_rates(args.bench_rates, args.target, start, ephemeris_path=args.ephemeris)
+        print(f"{args.target} por {args.bench_rates:g} h a {TRACK_RATE_HZ} Hz (erro so da quantizacao):")
+        for (path, name), e in r.items():
+            print(f"   {path:>6} {name:>14}: RMS {e['rms_arcsec']:8.2f}\" | max {e['max_arcsec']:8.2f}\" | "
+                  f"final {e['final_arcsec']:8.2f}\"")
+        return
+
+    if args.bench:
+        r = bench_tracking(args.bench, args.target, start, args.lookahead, args.feedback,
+                           backlash=args.backlash, ephemeris_path=args.ephemeris)
+        print(f"{args.target} por {args.bench:.0f} s ({r['samples']} amostras): "
+              f"erro RMS {r['rms_arcsec']:.1f}\" | mediana {r['median_arcsec']:.1f}\" | "
+              f"p95 {r['p95_arcsec']:.1f}\" | max {r['max_arcsec']:.1f}\"")
+        print(f"CPU do AstroControl {r['cpu_percent']:.1f}% (simulador {r['sim_cpu_percent']:.1f}%) | "
+              f"{r['frames_per_s']:.1f} frames/s")
+        if args.max_error is not None and r["rms_arcsec"] > args.max_error:
+            sys.exit(f"Erro RMS {r['rms_arcsec']:.1f}\" > {args.max_error:.1f}\"")
+        return
+
+    parser.print_help()
+
+if __name__ == "__main__":
+    main()
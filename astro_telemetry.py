@@ -0,0 +1,170 @@
+# GRAVADOR DE TELEMETRIA DO ASTROCONTROL
+# Grava cada posicao calculada do alvo, velocidade comandada e evento da serial
+# como registros de largura fixa (array estruturado NumPy). A cada lote os
+# registros viram colunas comprimidas com zlib, gravadas por uma thread propria:
+# o loop de TRACK so faz um append numa deque.
+#   python astro_telemetry.py sessao.astl                  (resumo)
+#   python astro_telemetry.py sessao.astl --csv sessao.csv (exporta para analise)
+# Formato: b"ASTL" + versao u16 + tamanho u32 + dtype (JSON), depois lotes
+# de [registros u32, bytes u32, zlib(coluna1 + coluna2 + ...)].
+# USO LIVRE :)
+
+import argparse
+import json
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+import numpy as np
+
+MAGIC = b"ASTL"
+VERSION = 2                 # 2: coluna sky (instante da efemeride)
+CHUNK_RECORDS = 4096        # registros por lote
+FLUSH_S = 5.0               # grava o lote parcial depois disso (perde no maximo 5 s)
+ZLIB_LEVEL = 6
+
+# registro fixo: t (unix s), sky (instante da efemeride usado no calculo, unix s;
+# NaN = nao se aplica), tipo, cmd (frame / codigo de erro) e 4 valores
+RECORD_DTYPE = np.dtype([
+    ("t", "<f8"),
+    ("sky", "<f8"),
+    ("kind", "u1"),
+    ("cmd", "u1"),
+    ("a", "<f4"),
+    ("b", "<f4"),
+    ("c", "<f4"),
+    ("d", "<f4"),
+])
+
+# tipos de registro e o significado de a, b, c, d
+TARGET = 1      # posicao calculada: az, alt, vaz, valt
+RATE = 2        # TRACK enviado: vaz, valt, atraso do tick (ms)
+SCHEDULE = 3    # agenda enviada: vaz, valt do 1o segmento, segmentos, atraso do tick (ms)
+POSITION = 4    # telemetria do mount: az mecanico, alt
+GOTO = 5        # GOTO enviado: az mecanico, alt
+ACK = 6         # ack do firmware (cmd = frame)
+ERROR = 7       # erro do firmware (cmd = codigo, a = frame)
+STATUS = 8      # serial conectada (a = 1) / desconectada (a = 0)
+
+KIND_NAMES = {
+    TARGET: "alvo", RATE: "track", SCHEDULE: "agenda", POSITION: "posicao",
+    GOTO: "goto", ACK: "ack", ERROR: "erro", STATUS: "status",
+}
+
+# ================= Gravador =================
+class TelemetryRecorder(threading.Thread):
+    def __init__(self, path, chunk=CHUNK_RECORDS, flush_s=FLUSH_S):
+        super().__init__(daemon=True)
+        self.path = path
+        self.chunk = chunk
+        self.flush_s = flush_s
+        self.pending = deque()      # append/popleft sao thread-safe
+        self.stop_event = threading.Event()
+        self.records = 0
+        self.bytes_written = 0
+
+        self.file = open(path, "wb")
+        descr = json.dumps(RECORD_DTYPE.descr).encode()
+        self.write(MAGIC + struct.pack("<HI", VERSION, len(descr)) + descr)
+
+    def record(self, kind, a=0.0, b=0.0, c=0.0, d=0.0, cmd=0, sky=float("nan")):
+        self.pending.append((time.time(), sky, kind, cmd, a, b, c, d))
+
+    def run(self):
+        while not self.stop_event.wait(self.flush_s):
+            self.flush()
+        self.flush()
+        self.file.close()
+
+    def flush(self):
+        while self.pending:
+            n = min(len(self.pending), self.chunk)
+            rows = [self.pending.popleft() for _ in range(n)]
+            self.write_chunk(np.array(rows, dtype=RECORD_DTYPE))
+        self.file.flush()
+
+    def write_chunk(self, records):
+        # por coluna: valores parecidos ficam juntos e comprimem muito melhor
+        raw = b"".join(records[name].tobytes() for name in RECORD_DTYPE.names)
+        data = zlib.compress(raw, ZLIB_LEVEL)
+        self.write(struct.pack("<II", len(records), len(data)) + data)
+        self.records += len(records)
+
+    def write(self, data):
+        self.file.write(data)
+        self.bytes_written += len(data)
+
+    def stop(self):
+        self.stop_event.set()
+
+    def wait(self, timeout=None):
+        self.join(timeout)
+
+# ================= Leitura =================
+def load_telemetry(path):
+    # array estruturado com todos os registros; um lote cortado no fim
+    # (programa fechado no meio da gravacao) e ignorado
+    with open(path, "rb") as f:
+        if f.read(4) != MAGIC:
+            raise ValueError(f"{path}: nao e um arquivo de telemetria")
+        version, size = struct.unpack("<HI", f.read(6))
+        if version not in (1, VERSION):
+            raise ValueError(f"{path}: versao {version} nao suportada")
+        dtype = np.dtype([tuple(field) for field in json.loads(f.read(size))])
+
+        chunks = []
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            count, length = struct.unpack("<II", header)
+            data = f.read(length)
+            if len(data) < length:
+                break
+
+            raw = zlib.decompress(data)
+            records = np.empty(count, dtype=dtype)
+            offset = 0
+            for name in dtype.names:
+                column = dtype[name]
+                records[name] = np.frombuffer(raw, column, count, offset)
+                offset += column.itemsize * count
+            chunks.append(records)
+
+    # versao 1 (sem sky) le com o dtype do proprio arquivo
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+
+def summary(records):
+    lines = []
+    if len(records):
+        duration = records["t"][-1] - records["t"][0]
+        lines.append(f"{len(records)} registros em {duration / 3600:.2f} h")
+    for kind, name in KIND_NAMES.items():
+        count = int(np.count_nonzero(records["kind"] == kind))
+        if count:
+            lines.append(f"{name:>8}: {count}")
+    return lines
+
+# ================= CLI =================
+def main():
+    parser = argparse.ArgumentParser(description="Le um arquivo de telemetria do AstroControl")
+    parser.add_argument("path")
+    parser.add_argument("--csv", help="exporta todos os registros para CSV")
+    args = parser.parse_args()
+
+    records = load_telemetry(args.path)
+    for line in summary(records):
+        print(line)
+
+    if args.csv:
+        sky = "sky" in records.dtype.names
+        with open(args.csv, "w") as f:
+            f.write("t,sky,kind,cmd,a,b,c,d\n")
+            for r in records:
+                f.write(f"{r['t']:.3f},{r['sky'] if sky else float('nan'):.3f},{KIND_NAMES.get(int(r['kind']), r['kind'])},{r['cmd']},"
+                        f"{r['a']:.6f},{r['b']:.6f},{r['c']:.6f},{r['d']:.6f}\n")
+        print(f"→ {args.csv}")
+
+if __name__ == "__main__":
+    main()
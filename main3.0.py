@@ -3,112 +3,79 @@
 # Utiliza biblioteca Skyfiel de421.bsd para calculos trigonometricos. Produzido pelo Jet Propulsion Laboratory (JPL) da NASA. Ele fornece dados de efemérides (posições e velocidades) precisos para o Sol, a Lua, planetas e os principais satélites do sistema solar, cobrindo o período de 1900 a 2050. 
 # USO LIVRE :)
 
-import sys
 import os
-import time
-import serial
+import sys
+import multiprocessing
 import serial.tools.list_ports
 from datetime import datetime
-from skyfield.api import load, Topos
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel,
-    QPushButton, QComboBox, QTextEdit, QLineEdit, QHBoxLayout, QCheckBox,
+    QPushButton, QComboBox, QPlainTextEdit, QLineEdit, QHBoxLayout, QCheckBox,
     QDateTimeEdit
 )
-from PyQt6.QtCore import QTimer, Qt, QDateTime, QThread, pyqtSignal
-
-class SerialWorker(QThread):
-    data_received = pyqtSignal(str)
-    status = pyqtSignal(bool, str)
-
-    def __init__(self, port, baud=9600):
-        super().__init__()
-        self.port = port
-        self.baud = baud
-        self.running = True
-        self.serial_thread = None
-
-    def run(self):
-        try:
-            self.ser = serial.Serial(self.port, self.baud, timeout=0.1)
-            self.status.emit(True, "🟢 Serial conectada")
-
-            buffer = b""
-
-            while self.running:
-                if self.ser.in_waiting:
-                    data = self.ser.read(self.ser.in_waiting)
-                    buffer += data
-
-                    #Apenas linhas ASCII
-                    while b'\n' in buffer:
-                        line, buffer = buffer.split(b'\n', 1)
-                        try:
-                            text = line.decode('ascii').strip()
-                            if text:
-                                self.data_received.emit(text)
-                        except UnicodeDecodeError:
-                            # ignora binario por enquanto
-                            pass
-
-                time.sleep(0.01)
-
-        except Exception as e:
-            self.status.emit(False, f"🔴 Serial erro: {e}")
-
-    def send(self, data: str):
-        if self.ser and self.ser.is_open:
-            self.ser.write(data.encode())
-
-    def stop(self):
-        self.running = False
-        if self.ser:
-            self.ser.close()
-def resource_path(relative_path):
-    try:
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
+from PyQt6.QtCore import QTimer, Qt, QDateTime, pyqtSignal
+from astro_engine import TrackingEngine, BAUD_RATES, DEFAULT_BAUD, TARGETS, TRACK_RATE_HZ
+from astro_planner import format_jd
+from astro_pointing import POINTING_FILE
+from astro_atmosphere import AtmosphereModel
+from astro_log import LogBuffer, format_line, LEVEL_NAMES, LOG_MAX_LINES, INFO, WARNING
+
+CATALOG_MIN_ALT = 20.0      # "visiveis agora": acima dessa altitude
+CATALOG_LOG_ROWS = 12
+PLAN_HOURS = 10.0           # janela do "Planejar noite" a partir de agora
+PASS_HOURS = 24.0           # janela das passagens de satelites (satellites.tle)
+LOG_FLUSH_MS = 250          # a caixa de log so e atualizada em lotes
+TRACK_RATES_HZ = (5, 10, 20, 50)   # satelites pedem mais que estrelas
+JOG_STEP_DEG = 0.1          # passo dos botoes de ajuste fino (centralizar para o sync)
 
 class AstroControl(QMainWindow):
+    # callbacks do motor chegam de outras threads; os sinais levam para a UI
+    engine_status = pyqtSignal(bool, str)
+    engine_position = pyqtSignal(float, float)
+    engine_ready = pyqtSignal(bool)
+    engine_catalog = pyqtSignal(str, object)
+    engine_plan = pyqtSignal(object, object)
+    engine_passes = pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("AstroControl Pro - v3.0")
 
-        # === Skyfield ===
-        self.ts = load.timescale()
-        self.planets = load(resource_path('de421.bsp')) 
-        self.earth = self.planets['earth']
-
-        # === Localização ===
-        self.latitude = -26.259963
-        self.longitude = -52.675883
-        self.altitude = 800
-
-        # === Tempo ===
-        self.use_manual_time = False
-
-        # === Estado ===
-        self.tel_az = 0.0
-        self.tel_alt = 0.0
-        self.moving = False
-        self.tracking = False
+        # === Motor (efemeride, TRACK, serial) ===
+        # a efemeride carrega em background: a janela aparece na hora
+        self.engine = TrackingEngine()
+        self.engine_status.connect(self.on_serial_status)
+        self.engine_position.connect(self.show_position)
+        self.engine_ready.connect(self.on_engine_ready)
+        self.engine_catalog.connect(self.on_catalog)
+        self.engine_plan.connect(self.on_plan)
+        self.engine_passes.connect(self.on_passes)
+        # log das threads do motor vai para o buffer; a UI busca em lotes
+        self.log_buffer = LogBuffer()
+        self.engine.on_log = self.log_buffer.add
+        self.engine.on_status = self.engine_status.emit
+        self.engine.on_position = self.engine_position.emit
+        self.engine.on_ready = self.engine_ready.emit
+        self.engine.on_catalog = self.engine_catalog.emit
+        self.engine.on_plan = self.engine_plan.emit
+        self.engine.on_passes = self.engine_passes.emit
 
-        # === Serial ===
-        self.ser = None
         self.bt_status = False
-        self.serial_thread = None
 
         self.init_ui()
 
+        # modelo de apontamento salvo ao lado do programa; cada sync regrava
+        if os.path.exists(POINTING_FILE):
+            self.engine.load_pointing(POINTING_FILE)
+        self.engine.pointing_path = POINTING_FILE
+
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_display)
         self.timer.start(1000)
 
-        # === Timer de TRACK ===
-        self.track_timer = QTimer()
-        self.track_timer.timeout.connect(self.track_target)
+        self.log_timer = QTimer()
+        self.log_timer.timeout.connect(self.flush_log)
+        self.log_timer.start(LOG_FLUSH_MS)
 
     # ================= UI =================
     def init_ui(self):
@@ -125,21 +92,54 @@ class AstroControl(QMainWindow):
         self.btn_scan_bt.clicked.connect(self.scan_bt_devices)
         self.btn_connect_bt.clicked.connect(self.connect_bt)
 
+        self.baud_combo = QComboBox()
+        self.baud_combo.addItems([str(b) for b in BAUD_RATES])
+        self.baud_combo.setCurrentText(str(DEFAULT_BAUD))
+        self.btn_baud = QPushButton("Negociar baud")
+        self.btn_baud.clicked.connect(self.negotiate_baud)
+
         bt_layout.addWidget(self.bt_combo)
+        bt_layout.addWidget(self.baud_combo)
         bt_layout.addWidget(self.btn_scan_bt)
         bt_layout.addWidget(self.btn_connect_bt)
+        bt_layout.addWidget(self.btn_baud)
         layout.addLayout(bt_layout)
 
+        self.telemetry_check = QCheckBox("Telemetria binária de posição")
+        self.telemetry_check.stateChanged.connect(
+            lambda *a: self.engine.set_telemetry(self.telemetry_check.isChecked())
+        )
+        layout.addWidget(self.telemetry_check)
+
+        self.record_check = QCheckBox("Gravar telemetria (.astl)")
+        self.record_check.stateChanged.connect(self.toggle_recording)
+        layout.addWidget(self.record_check)
+
         self.scan_bt_devices()
 
         # === Astro ===
         layout.addWidget(QLabel("Alvo Astronômico"))
         self.astro_selector = QComboBox()
-        self.astro_selector.addItems(
-            ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter Barycenter", "Saturn Barycenter"]
-        )
+        self.astro_selector.addItems(TARGETS)
+        self.astro_selector.currentTextChanged.connect(self.engine.set_target)
         layout.addWidget(self.astro_selector)
 
+        # === Catalogo (estrelas / Messier / NGC) ===
+        cat = QHBoxLayout()
+        btn_visible = QPushButton("Visíveis agora (>20°)")
+        btn_visible.clicked.connect(self.show_visible)
+        btn_nearest = QPushButton("Perto do telescópio")
+        btn_nearest.clicked.connect(self.show_nearest)
+        cat.addWidget(btn_visible)
+        cat.addWidget(btn_nearest)
+        btn_plan = QPushButton("Planejar noite")
+        btn_plan.clicked.connect(self.plan_night)
+        cat.addWidget(btn_plan)
+        btn_passes = QPushButton(f"Satélites ({PASS_HOURS:.0f} h)")
+        btn_passes.clicked.connect(self.show_passes)
+        cat.addWidget(btn_passes)
+        layout.addLayout(cat)
+
         # === Status ===
         self.status_label = QLabel()
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -149,9 +149,9 @@ class AstroControl(QMainWindow):
         layout.addWidget(QLabel("Localização"))
 
         loc = QHBoxLayout()
-        self.lat_input = QLineEdit(str(self.latitude))
-        self.lon_input = QLineEdit(str(self.longitude))
-        self.alt_input = QLineEdit(str(self.altitude))
+        self.lat_input = QLineEdit(str(self.engine.latitude))
+        self.lon_input = QLineEdit(str(self.engine.longitude))
+        self.alt_input = QLineEdit(str(self.engine.altitude))
         loc.addWidget(self.lat_input)
         loc.addWidget(self.lon_input)
         loc.addWidget(self.alt_input)
@@ -171,12 +171,16 @@ class AstroControl(QMainWindow):
         self.temp_input.setPlaceholderText("Temp (°C)")
         self.press_input.setPlaceholderText("Pressão (mbar)")
 
+        self.temp_input.editingFinished.connect(self.apply_atmosphere)
+        self.press_input.editingFinished.connect(self.apply_atmosphere)
+
         atm.addWidget(self.temp_input)
         atm.addWidget(self.press_input)
         layout.addLayout(atm)
 
         self.use_refraction = QCheckBox("Usar refração atmosférica")
         self.use_refraction.setChecked(True)
+        self.use_refraction.stateChanged.connect(self.apply_atmosphere)
         layout.addWidget(self.use_refraction)
 
         # === Tempo ===
@@ -187,19 +191,41 @@ class AstroControl(QMainWindow):
         self.datetime_edit = QDateTimeEdit(QDateTime.currentDateTime())
         self.datetime_edit.setDisplayFormat("dd/MM/yyyy HH:mm:ss")
         self.datetime_edit.setEnabled(False)
+        self.datetime_edit.dateTimeChanged.connect(self.apply_manual_time)
         layout.addWidget(self.datetime_edit)
 
         # === Coordenadas ===
-        self.coord_label = QLabel("AZ: 0.00° | ALT: 0.00°")
+        self.coord_label = QLabel("⏳ Carregando efeméride...")
         self.coord_label.setStyleSheet("font-size:18px;font-weight:bold")
         layout.addWidget(self.coord_label)
 
         self.tel_label = QLabel("TEL → AZ: 0.00° | ALT: 0.00°")
         layout.addWidget(self.tel_label)
 
+        self.cache_label = QLabel("Cache geometria: 0 hits | 0 rebuilds")
+        layout.addWidget(self.cache_label)
+
+        self.link_label = QLabel("Serial TX: fila 0 | 0 B/s | 0 coalescidos")
+        layout.addWidget(self.link_label)
+
+        self.scheduler_label = QLabel("Agendador TRACK: parado")
+        layout.addWidget(self.scheduler_label)
+
         # === Log ===
-        self.log = QTextEdit()
+        log_bar = QHBoxLayout()
+        log_bar.addWidget(QLabel("Log"))
+        self.log_level = QComboBox()
+        for level, name in LEVEL_NAMES.items():
+            self.log_level.addItem(name, level)
+        self.log_level.setCurrentIndex(self.log_level.findData(INFO))
+        self.log_level.currentIndexChanged.connect(self.refilter_log)
+        log_bar.addWidget(self.log_level)
+        layout.addLayout(log_bar)
+
+        # QPlainTextEdit com limite de blocos: memoria fixa em sessoes longas
+        self.log = QPlainTextEdit()
         self.log.setReadOnly(True)
+        self.log.setMaximumBlockCount(LOG_MAX_LINES)
         layout.addWidget(self.log)
 
         # === Botões ===
@@ -207,14 +233,52 @@ class AstroControl(QMainWindow):
         self.btn_goto.clicked.connect(self.send_goto)
         layout.addWidget(self.btn_goto)
 
+        track_bar = QHBoxLayout()
         self.btn_track = QPushButton("TRACK OFF")
         self.btn_track.clicked.connect(self.toggle_track)
-        layout.addWidget(self.btn_track)
+        track_bar.addWidget(self.btn_track)
+        self.track_rate = QComboBox()
+        for hz in TRACK_RATES_HZ:
+            self.track_rate.addItem(f"{hz} Hz", float(hz))
+        self.track_rate.setCurrentIndex(self.track_rate.findData(TRACK_RATE_HZ))
+        self.track_rate.currentIndexChanged.connect(
+            lambda *a: self.engine.set_track_rate(self.track_rate.currentData())
+        )
+        track_bar.addWidget(self.track_rate)
+        layout.addLayout(track_bar)
+
+        self.lookahead_check = QCheckBox("Agenda antecipada de velocidades (look-ahead)")
+        self.lookahead_check.stateChanged.connect(
+            lambda *a: self.engine.set_lookahead(self.lookahead_check.isChecked())
+        )
+        layout.addWidget(self.lookahead_check)
+
+        self.feedback_check = QCheckBox("Correção por realimentação de posição (POS)")
+        self.feedback_check.stateChanged.connect(
+            lambda *a: self.engine.set_feedback(self.feedback_check.isChecked())
+        )
+        layout.addWidget(self.feedback_check)
 
         btn_zero = QPushButton("Definir ZERO")
         btn_zero.clicked.connect(self.sync_zero)
         layout.addWidget(btn_zero)
 
+        # === Modelo de apontamento: centraliza o alvo e sincroniza ===
+        jog = QHBoxLayout()
+        for text, daz, dalt in (("◀ AZ", -1, 0), ("AZ ▶", 1, 0), ("▼ ALT", 0, -1), ("ALT ▲", 0, 1)):
+            btn = QPushButton(text)
+            btn.clicked.connect(
+                lambda _, a=daz, e=dalt: self.engine.jog(a * JOG_STEP_DEG, e * JOG_STEP_DEG)
+            )
+            jog.addWidget(btn)
+        btn_sync = QPushButton("Sync (modelo)")
+        btn_sync.clicked.connect(self.add_sync_point)
+        jog.addWidget(btn_sync)
+        btn_clear_model = QPushButton("Limpar modelo")
+        btn_clear_model.clicked.connect(self.engine.clear_pointing)
+        jog.addWidget(btn_clear_model)
+        layout.addLayout(jog)
+
         container = QWidget()
         container.setLayout(layout)
         self.setCentralWidget(container)
@@ -228,199 +292,225 @@ class AstroControl(QMainWindow):
 
     def connect_bt(self):
         port = self.bt_combo.currentText()
+        self.engine.connect(port, int(self.baud_combo.currentText()))
 
-        self.serial_thread = SerialWorker(port)
-        self.serial_thread.data_received.connect(self.on_serial_data)
-        self.serial_thread.status.connect(self.on_serial_status)
-
-        self.serial_thread.start()
-
-    def on_serial_data(self, line):
-        self.log_msg(f"📡 Arduino → {line}")
+    def negotiate_baud(self):
+        self.engine.negotiate_baud(int(self.baud_combo.currentText()))
 
     def on_serial_status(self, ok, msg):
         self.bt_status = ok
-        self.log_msg(msg)
         self.update_status()
 
-    # ================= Astronomia =================
-    def get_time(self):
-        if self.use_manual_time:
-            return self.ts.from_datetime(
-                self.datetime_edit.dateTime().toPyDateTime()
-            )
-        return self.ts.now()
-
-    def get_az_alt(self):
-        loc = self.earth + Topos(
-            latitude_degrees=self.latitude,
-            longitude_degrees=self.longitude,
-            elevation_m=self.altitude
-        )
-
-        body = self.planets[self.astro_selector.currentText().lower()]
-        astrometric = loc.at(self.get_time()).observe(body).apparent()
-
-        temp, press = self.get_atmosphere()
-
-        if temp is not None and press is not None:
-            alt, az, _ = astrometric.altaz(
-                temperature_C=temp,
-                pressure_mbar=press
-            )
+    def on_engine_ready(self, ok):
+        if ok:
+            self.update_display()
         else:
-            alt, az, _ = astrometric.altaz()
+            self.coord_label.setText("🔴 Efeméride não carregou")
+        self.update_status()
 
-        return az.degrees, alt.degrees
-    
-    def get_atmosphere(self):
-        if not self.use_refraction.isChecked():
-            return None, None
+    def toggle_recording(self, *args):
+        if self.record_check.isChecked():
+            self.engine.start_recording(datetime.now().strftime("telemetria_%Y%m%d_%H%M%S.astl"))
+        else:
+            self.engine.stop_recording()
+
+    # ================= Catalogo =================
+    def show_visible(self):
+        if not self.engine.request_visible(CATALOG_MIN_ALT):
+            self.log_msg("⏳ Catálogo ainda não carregado")
+
+    def show_nearest(self):
+        if not self.engine.request_nearest(self.engine.tel_az, self.engine.tel_alt):
+            self.log_msg("⏳ Catálogo ainda não carregado")
+
+    def on_catalog(self, tag, rows):
+        if tag == "visible":
+            # seletor = alvos do sistema solar + objetos visiveis agora
+            current = self.astro_selector.currentText()
+            self.astro_selector.blockSignals(True)
+            self.astro_selector.clear()
+            self.astro_selector.addItems(TARGETS)
+            if rows:
+                self.astro_selector.insertSeparator(len(TARGETS))
+                self.astro_selector.addItems([r[0] for r in rows])
+            self.astro_selector.setCurrentText(current)
+            self.astro_selector.blockSignals(False)
+            self.log_msg(f"✨ {len(rows)} objetos acima de {CATALOG_MIN_ALT:.0f}°")
+        else:
+            self.log_msg(f"🎯 Mais próximos de AZ {self.engine.tel_az:.1f}° ALT {self.engine.tel_alt:.1f}°:")
+
+        for name, kind, mag, az, alt, sep in rows[:CATALOG_LOG_ROWS]:
+            extra = f" | {sep:.1f}° do telescópio" if sep is not None else ""
+            self.log_msg(f"   {name} ({kind}, mag {mag:.1f}) AZ {az:.1f}° ALT {alt:.1f}°{extra}")
+
+    def plan_night(self):
+        # todos os alvos do seletor (sistema solar + visiveis do catalogo)
+        names = [self.astro_selector.itemText(i) for i in range(self.astro_selector.count())]
+        names = [n for n in names if n]
+        if self.engine.request_plan(names, PLAN_HOURS, CATALOG_MIN_ALT):
+            self.log_msg(f"🗓️ Planejando {len(names)} alvos para as próximas {PLAN_HOURS:.0f} h...")
+        else:
+            self.log_msg("⏳ Efeméride ainda não carregada")
+
+    def on_plan(self, order, skipped):
+        self.log_msg(f"🗓️ Ordem de observação ({len(order)} alvos):")
+        for item in order:
+            self.log_msg(
+                f"   {format_jd(self.engine.service.ts, item['start'])} {item['name']} "
+                f"(slew {item['slew_s']:.1f} s) AZ {item['az']:.1f}° ALT {item['alt']:.1f}°"
+            )
+        if skipped:
+            self.log_msg(f"   Fora do plano: {', '.join(skipped)}")
 
-        try:
-            temp = float(self.temp_input.text())
-            press = float(self.press_input.text())
-            return temp, press
-        except:
-            self.log_msg("⚠️ Dados atmosfericos inválida, usando Skyfiel sem correção do horizonte baixo")
-            return None, None
+    def show_passes(self):
+        if self.engine.request_passes(PASS_HOURS):
+            self.log_msg(f"🛰️ Calculando passagens das próximas {PASS_HOURS:.0f} h...")
+        else:
+            self.log_msg("⏳ Sem satellites.tle ou efeméride ainda carregando")
+
+    def on_passes(self, passes):
+        # satelites com passagem entram no seletor; GOTO espera no ponto de entrada
+        names = list(dict.fromkeys(p["name"] for p in passes))
+        new = [n for n in names if self.astro_selector.findText(n) < 0]
+        current = self.astro_selector.currentText()
+        self.astro_selector.blockSignals(True)
+        if new:
+            self.astro_selector.insertSeparator(self.astro_selector.count())
+            self.astro_selector.addItems(new)
+        self.astro_selector.setCurrentText(current)
+        self.astro_selector.blockSignals(False)
+
+        self.log_msg(f"🛰️ {len(passes)} passagens de {len(names)} satélites:")
+        ts = self.engine.service.ts
+        for p in passes[:CATALOG_LOG_ROWS]:
+            self.log_msg(
+                f"   {format_jd(ts, p['rise'])} → {format_jd(ts, p['set'])} {p['name']} "
+                f"max {p['max_alt']:.0f}° | AZ {p['rise_az']:.0f}° → {p['set_az']:.0f}°"
+            )
 
     # ================= Ações =================
     def send_goto(self):
-        az, alt = self.get_az_alt()
-        if alt < -0.5:
-            self.log_msg("🔴 Alvo abaixo do horizonte (refração ignorada)")
-            return
-
-        # Calcular menor delta para azimute
-        delta_az = (az - self.tel_az + 180) % 360 - 180
-        final_az = self.tel_az + delta_az
-
-        cmd = f"GOTO AZ={final_az:.2f} ALT={alt:.2f}\n"
-        if self.serial_thread:
-            self.serial_thread.send(cmd)
-
-        self.tel_az = az
-        self.tel_alt = alt
-        self.log_msg(f"🟡 {cmd.strip()}")
+        self.engine.goto()
 
     def toggle_track(self):
-        self.tracking = not self.tracking
-
-        if self.tracking:
-            self.track_timer.start(100)
+        if not self.engine.tracking:
+            self.engine.start_tracking()
             self.btn_track.setText("TRACK ON")
-            self.log_msg("🟢 TRACK ativado")
         else:
-            self.track_timer.stop()
-
-            if self.serial_thread:
-                self.serial_thread.send("STOP\n")
-
+            self.engine.stop_tracking()
             self.btn_track.setText("TRACK OFF")
-            self.log_msg("🛑 TRACK desativado")
 
         self.update_status()
 
-    def track_target(self):
-        if not self.serial_thread or not self.tracking:
-            return
-
-        now = datetime.utcnow().timestamp()
-        az, alt = self.get_az_alt()
-
-        if not hasattr(self, "last_track_time"):
-            self.last_track_time = now
-            self.last_az = az
-            self.last_alt = alt
-            return
-
-        if alt < 1.0:
-            return
-        
-        dt = now - self.last_track_time
-        if dt <= 0:
-            return
-
-        # velocidade angular (graus por segundo)
-        vaz = (az - self.last_az) / dt
-        valt = (alt - self.last_alt) / dt
-
-        # ignora micro ruido ou microvariações para nao sobrecarregar
-        if abs(vaz) < 0.0001 and abs(valt) < 0.0001:
-            return
-
-        cmd = f"TRACK VAZ={vaz:.6f} VALT={valt:.6f}\n"
-        self.send_track_binary(vaz, valt)
-
-        self.last_track_time = now
-        self.last_az = az
-        self.last_alt = alt
-
     def sync_zero(self):
-        self.tel_az = 0
-        self.tel_alt = 0
-        if self.serial_thread:
-            self.serial_thread.send("ZERO\n")
-        self.log_msg("ZERO definido")
+        self.engine.sync_zero()
+
+    def add_sync_point(self):
+        if not self.engine.add_sync_point():
+            self.log_msg("⏳ Efeméride ainda não carregada")
 
     def apply_manual_location(self):
         try:
-            self.latitude = float(self.lat_input.text())
-            self.longitude = float(self.lon_input.text())
-            self.altitude = float(self.alt_input.text())
+            self.engine.set_location(
+                float(self.lat_input.text()),
+                float(self.lon_input.text()),
+                float(self.alt_input.text())
+            )
             self.log_msg("📍 Localização aplicada")
         except:
             self.log_msg("Erro de localização")
 
-    def toggle_manual_time(self, s):
-        self.use_manual_time = s == Qt.CheckState.Checked
-        self.datetime_edit.setEnabled(self.use_manual_time)
+    def apply_atmosphere(self, *args):
+        if not self.use_refraction.isChecked():
+            self.engine.set_atmosphere(None, None)
+            return
+
+        # validado uma vez ao editar; o calculo so usa a tabela do modelo
+        try:
+            model = AtmosphereModel.parse(self.temp_input.text(), self.press_input.text())
+        except ValueError as e:
+            self.engine.set_atmosphere(None, None)
+            self.log_msg(f"⚠️ Atmosfera inválida ({e}), usando Skyfield sem correção do horizonte baixo", WARNING)
+            return
+        self.engine.set_atmosphere(model.temp, model.press)
+
+    def toggle_manual_time(self, *args):
+        self.datetime_edit.setEnabled(self.manual_time_check.isChecked())
+        self.apply_manual_time()
+
+    def apply_manual_time(self, *args):
+        if self.manual_time_check.isChecked():
+            # datetime local sem fuso → com fuso (o Skyfield exige)
+            self.engine.manual_time = self.datetime_edit.dateTime().toPyDateTime().astimezone()
+        else:
+            self.engine.manual_time = None
 
     # ================= Atualização =================
     def update_display(self):
-        az, alt = self.get_az_alt()
+        self.engine.request_az_alt("display")
+
+    def show_position(self, az, alt):
+        engine = self.engine
         self.coord_label.setText(f"AZ: {az:.2f}° | ALT: {alt:.2f}°")
-        self.tel_label.setText(f"TEL → AZ: {self.tel_az:.2f}° | ALT: {self.tel_alt:.2f}°")
+        self.tel_label.setText(f"TEL → AZ: {engine.tel_az:.2f}° | ALT: {engine.tel_alt:.2f}°")
+        if engine.feedback.err_az is not None:
+            self.tel_label.setText(
+                self.tel_label.text() +
+                f" | ERRO → AZ: {engine.feedback.err_az:+.3f}° | ALT: {engine.feedback.err_alt:+.3f}°"
+            )
+        self.cache_label.setText(
+            f"Cache geometria: {engine.service.ephemeris.geo_hits} hits | "
+            f"{engine.service.ephemeris.geo_rebuilds} rebuilds"
+        )
+        if engine.link:
+            self.link_label.setText(
+                f"Serial TX: fila {engine.link.queue_depth()} | "
+                f"{engine.link.bytes_per_second()} B/s | "
+                f"{engine.link.coalesced} coalescidos"
+            )
+        if engine.tracking and engine.scheduler:
+            self.scheduler_label.setText(f"Agendador TRACK: {engine.scheduler.summary()}")
 
     def update_status(self):
         bt = "🟢 BT" if self.bt_status else "🔴 BT"
-        tr = "🟡 TRACK" if self.tracking else "⚪ TRACK"
-        self.status_label.setText(f"{bt} | {tr}")
-
-    def log_msg(self, msg):
-        self.log.append(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}")
-
-    def closeEvent(self, event):
-        if self.serial_thread:
-            self.serial_thread.stop()
-            self.serial_thread.wait()
-        event.accept()
+        tr = "🟡 TRACK" if self.engine.tracking else "⚪ TRACK"
+        eph = "🟢 EFEM" if self.engine.ready.is_set() else "⏳ EFEM"
+        self.status_label.setText(f"{bt} | {tr} | {eph}")
 
-    def send_track_binary(self, vaz, valt):
-        # converte °/s → milideg/s
-        vaz_i = int(vaz * 1000)
-        valt_i = int(valt * 1000)
+    def log_msg(self, msg, level=INFO):
+        self.log_buffer.add(msg, level)
 
-        payload = (
-            b'\x02' +
-            b'T' +
-            vaz_i.to_bytes(4, 'little', signed=True) +
-            valt_i.to_bytes(4, 'little', signed=True)
-        )
+    def flush_log(self):
+        lines = self.log_buffer.drain(self.log_level.currentData())
+        if lines:
+            self.log.appendPlainText("\n".join(format_line(line) for line in lines))
 
-        chk = sum(payload[1:]) & 0xFF
-        frame = payload + bytes([chk]) + b'\x03'
+    def refilter_log(self, *args):
+        self.log_buffer.drain()
+        lines = self.log_buffer.snapshot(self.log_level.currentData())
+        self.log.setPlainText("\n".join(format_line(line) for line in lines))
+        self.log.verticalScrollBar().setValue(self.log.verticalScrollBar().maximum())
 
-        self.serial_thread.ser.write(frame)
-
-        self.log_msg(
-            f"🟣 TRACK BIN → "
-            f"VAZ={vaz:+.6f} °/s | "
-            f"VALT={valt:+.6f} °/s"
-        )
+    def closeEvent(self, event):
+        self.engine.shutdown()
+        event.accept()
 
 if __name__ == "__main__":
+    # o planejador usa processos; no executavel do PyInstaller isso e obrigatorio
+    multiprocessing.freeze_support()
+
+    if "--bench-link" in sys.argv:
+        import argparse
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--bench-link", action="store_true")
+        parser.add_argument("--port")
+        parser.add_argument("--baud", type=int, default=DEFAULT_BAUD)
+        parser.add_argument("--frames", type=int, default=300)
+        args = parser.parse_args()
+        from astro_sim import bench_link
+        bench_link(args.port, args.baud, args.frames)
+        sys.exit(0)
+
     app = QApplication(sys.argv)
     w = AstroControl()
     w.show()
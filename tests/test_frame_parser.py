@@ -0,0 +1,20 @@
+from astro_engine import FrameParser, build_frame
+
+def test_bad_checksum_keeps_next_line():
+    frame = bytearray(build_frame(b'P', bytes(8)))
+    frame[-2] ^= 0xFF
+    parser = FrameParser()
+    assert parser.feed(bytes(frame) + b"OK\n") == [("line", None, "OK")]
+    assert parser.bad_frames == 1
+
+def test_missing_etx_keeps_next_line():
+    frame = bytearray(build_frame(b'P', bytes(8)))
+    frame[-1] = 0x00
+    parser = FrameParser()
+    assert parser.feed(bytes(frame) + b"OK\n") == [("line", None, "OK")]
+
+def test_bad_frame_then_good_frame():
+    bad = bytearray(build_frame(b'A', b'T'))
+    bad[-2] ^= 0xFF
+    good = build_frame(b'A', b'S')
+    assert FrameParser().feed(bytes(bad) + good) == [("frame", "A", b"S")]
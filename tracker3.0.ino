@@ -15,11 +15,18 @@ AccelStepper motorAz(AccelStepper::DRIVER, AZ_STEP, AZ_DIR);
 AccelStepper motorAlt(AccelStepper::DRIVER, ALT_STEP, ALT_DIR);
 
 // ================== CONFIG ==================
+// velocidade inicial da serial: 9600, a dos modulos Bluetooth HC-05 de fabrica.
+// Com cabo USB o host pode subir em tempo real com "BAUD <n>"; pelo HC-05 nao
+// (so a UART do Arduino troca e o link cai)
+const long SERIAL_BAUD = 9600;
+const int PROTOCOL_VERSION = 2;        // respondido no VER
+
 const float AZ_STEPS_PER_DEG = 20.0;
 const float ALT_STEPS_PER_DEG = 20.0;
 
 // Limites físicos do hardware
-const float AZ_MIN = 0, AZ_MAX = 359.999; // Eixo horizontal
+// az mecanico desde o ZERO: o host escolhe a volta (enrolamento do cabo ±270°)
+const float AZ_MIN = -270, AZ_MAX = 270;  // Eixo horizontal
 const float ALT_MIN = 0, ALT_MAX = 90;    // Eixo vertical (azimute 90)
 
 // LIMPAR VARIÁVEIS
@@ -38,10 +45,28 @@ float speedAlt = 0;
 const int BACKLASH_AZ_STEPS = 5;
 const int BACKLASH_ALT_STEPS = 5;
 
+// agenda de velocidades futuras (frame binario 'S')
+// limite pelo buffer de 64 bytes da Serial do UNO: 5 segmentos = 57 bytes
+const int SEG_MAX = 5;
+int segCount = 0;
+int segIndex = 0;
+unsigned long segStartMs = 0;
+unsigned int segOffsetMs[SEG_MAX];
+float segSpeedAz[SEG_MAX];
+float segSpeedAlt[SEG_MAX];
+
+// telemetria binaria de posicao (frame 'P'), 0 = desligada
+unsigned long telemMs = 0;
+unsigned long lastTelem = 0;
+
+// codigos do frame de erro 'E'
+const byte ERR_CHECKSUM = 1;
+const byte ERR_LENGTH = 2;
+
 // ================== SETUP ==================
 void setup()
 {
-  Serial.begin(9600);
+  Serial.begin(SERIAL_BAUD);
 
   motorAz.setMaxSpeed(800);
   motorAz.setAcceleration(400);
@@ -62,6 +87,7 @@ void loop()
 
   if (tracking)
   {
+    updateSchedule();
     motorAz.setSpeed(speedAz);
     motorAlt.setSpeed(speedAlt);
     motorAz.runSpeed();
@@ -78,6 +104,12 @@ void loop()
       currentAlt = motorAlt.currentPosition() / ALT_STEPS_PER_DEG;
     }
   }
+
+  if (telemMs > 0 && millis() - lastTelem >= telemMs)
+  {
+    lastTelem = millis();
+    sendPosition();
+  }
 }
 
 // ================== SERIAL ==================
@@ -86,6 +118,10 @@ void readCommand()
 {
   while (Serial.available())
   {
+    // inicio de frame binario: deixa para readBinaryTrack
+    if (inputString.length() == 0 && Serial.peek() == 0x02)
+      return;
+
     char inChar = (char)Serial.read();
     if (inChar == '\n')
     {
@@ -105,15 +141,46 @@ void parseCommand(String cmd)
   if (cmd.startsWith("GOTO"))
   {
     parseGoto(cmd);
+    segCount = 0;
     tracking = false;
     Serial.println("OK GOTO");
   }
   else if (cmd.startsWith("TRACK"))
   {
+    segCount = 0;
     parseTrackSpeed(cmd);
     tracking = true;
     Serial.println("OK TRACK");
   }
+  else if (cmd.startsWith("BAUD"))
+  {
+    long baud = cmd.substring(5).toInt();
+    if (baud < 9600)
+    {
+      Serial.println("ERR BAUD");
+      return;
+    }
+    // responde na velocidade antiga e so entao troca
+    Serial.println("OK BAUD");
+    Serial.flush();
+    Serial.end();
+    Serial.begin(baud);
+  }
+  else if (cmd == "POS")
+  {
+    // posicao real em passos para a realimentacao do host
+    sendPosition();
+  }
+  else if (cmd.startsWith("TELEM"))
+  {
+    telemMs = cmd.substring(6).toInt();
+    Serial.println("OK TELEM");
+  }
+  else if (cmd == "VER")
+  {
+    // versao do protocolo: 2 = aceita 'U'/'V' (microdeg/s)
+    Serial.println("OK VER " + String(PROTOCOL_VERSION));
+  }
   else if (cmd == "ZERO")
   {
     zeroPosition();
@@ -121,6 +188,7 @@ void parseCommand(String cmd)
   }
   else if (cmd == "STOP")
   {
+    segCount = 0;
     speedAz = 0;
     speedAlt = 0;
 
@@ -180,18 +248,11 @@ void applyBacklash(long nextAzSteps, long nextAltSteps)
 
 void moveTo(float az, float alt)
 {
-  // Respeita limites fisicos
+  // Respeita limites fisicos; o caminho (e a volta) ja vem decidido pelo host
   az = constrain(az, AZ_MIN, AZ_MAX);
   alt = constrain(alt, ALT_MIN, ALT_MAX);
 
-  // Calcular menor delta (menor caminho) para voltas maiores que 180 nao derem a volta contando - graus
-  float deltaAz = az - currentAz;
-  if (deltaAz > 180)
-    deltaAz -= 360;
-  if (deltaAz < -180)
-    deltaAz += 360;
-
-  long azSteps = (currentAz + deltaAz) * AZ_STEPS_PER_DEG;
+  long azSteps = az * AZ_STEPS_PER_DEG;
   long altSteps = alt * ALT_STEPS_PER_DEG;
 
   applyBacklash(azSteps, altSteps);
@@ -238,35 +299,162 @@ void parseTrackSpeed(String cmd)
 }
 
 // ================== BYNARY TRACKER ==================
+// Frames: 0x02 cmd payload chk 0x03, chk = soma(cmd + payload) & 0xFF
+// host → mount:
+//   'T': VAZ i32, VALT i32 (milideg/s)
+//   'S': N u8, N x [offset u16 (ms), VAZ i32, VALT i32]
+//   'U', 'V': iguais a 'T' e 'S' em microdeg/s (protocolo 2, ver VER)
+// mount → host:
+//   'P': passos AZ i32, passos ALT i32
+//   'A': cmd confirmado
+//   'E': codigo u8, cmd
 bool readBinaryTrack()
 {
-  if (Serial.available() < 12)
-    return false;
-
-  if (Serial.read() != 0x02)
+  if (Serial.available() < 2 || Serial.peek() != 0x02)
     return false;
 
+  Serial.read();
   char cmd = Serial.read();
-  if (cmd != 'T')
+
+  bool ok = false;
+  if (cmd == 'T')
+    ok = readTrackFrame('T', 1000.0);
+  else if (cmd == 'S')
+    ok = readScheduleFrame('S', 1000.0);
+  else if (cmd == 'U')
+    ok = readTrackFrame('U', 1000000.0);
+  else if (cmd == 'V')
+    ok = readScheduleFrame('V', 1000000.0);
+
+  if (ok)
+    sendFrame('A', (byte *)&cmd, 1);
+  return ok;
+}
+
+bool readFrameEnd(char cmd, byte sum)
+{
+  byte end[2];
+  if (Serial.readBytes(end, 2) != 2)
+  {
+    sendError(ERR_LENGTH, cmd);
+    return false;
+  }
+  if (end[0] != (sum & 0xFF) || end[1] != 0x03)
+  {
+    sendError(ERR_CHECKSUM, cmd);
     return false;
+  }
+  return true;
+}
+
+// ================== TELEMETRIA BINARIA ==================
+void sendFrame(char cmd, const byte *payload, byte len)
+{
+  byte sum = cmd;
+  for (byte i = 0; i < len; i++)
+    sum += payload[i];
+
+  Serial.write(0x02);
+  Serial.write(cmd);
+  Serial.write(payload, len);
+  Serial.write(sum);
+  Serial.write(0x03);
+}
 
-  int32_t vaz_i = 0;
-  int32_t valt_i = 0;
+void sendError(byte code, char cmd)
+{
+  byte payload[2] = {code, (byte)cmd};
+  sendFrame('E', payload, 2);
+}
 
-  Serial.readBytes((byte *)&vaz_i, 4);
-  Serial.readBytes((byte *)&valt_i, 4);
+void sendPosition()
+{
+  int32_t pos[2] = {motorAz.currentPosition(), motorAlt.currentPosition()};
+  sendFrame('P', (byte *)pos, 8);
+}
 
-  byte chk = Serial.read();
-  if (Serial.read() != 0x03)
+bool readTrackFrame(char cmd, float scale)
+{
+  byte buf[8];
+  if (Serial.readBytes(buf, 8) != 8)
+  {
+    sendError(ERR_LENGTH, cmd);
     return false;
+  }
 
-  // converte milideg/s → steps/s
-  speedAz = (vaz_i / 1000.0) * AZ_STEPS_PER_DEG;
-  speedAlt = (valt_i / 1000.0) * ALT_STEPS_PER_DEG;
+  byte sum = cmd;
+  for (int i = 0; i < 8; i++)
+    sum += buf[i];
+  if (!readFrameEnd(cmd, sum))
+    return false;
+
+  int32_t vaz_i, valt_i;
+  memcpy(&vaz_i, buf, 4);
+  memcpy(&valt_i, buf + 4, 4);
+
+  // converte milideg/s (ou microdeg/s) → steps/s
+  speedAz = (vaz_i / scale) * AZ_STEPS_PER_DEG;
+  speedAlt = (valt_i / scale) * ALT_STEPS_PER_DEG;
 
   speedAz = constrain(speedAz, -200, 200);
   speedAlt = constrain(speedAlt, -200, 200);
 
+  segCount = 0;
   tracking = true;
   return true;
 }
+
+bool readScheduleFrame(char cmd, float scale)
+{
+  byte n;
+  byte buf[SEG_MAX * 10];
+  if (Serial.readBytes(&n, 1) != 1 || n == 0 || n > SEG_MAX ||
+      Serial.readBytes(buf, n * 10) != n * 10)
+  {
+    sendError(ERR_LENGTH, cmd);
+    return false;
+  }
+
+  byte sum = cmd + n;
+  for (int i = 0; i < n * 10; i++)
+    sum += buf[i];
+  if (!readFrameEnd(cmd, sum))
+    return false;
+
+  for (int i = 0; i < n; i++)
+  {
+    uint16_t off;
+    int32_t vaz_i, valt_i;
+    memcpy(&off, buf + i * 10, 2);
+    memcpy(&vaz_i, buf + i * 10 + 2, 4);
+    memcpy(&valt_i, buf + i * 10 + 6, 4);
+
+    segOffsetMs[i] = off;
+    segSpeedAz[i] = constrain((vaz_i / scale) * AZ_STEPS_PER_DEG, -200, 200);
+    segSpeedAlt[i] = constrain((valt_i / scale) * ALT_STEPS_PER_DEG, -200, 200);
+  }
+
+  segCount = n;
+  segIndex = 0;
+  segStartMs = millis();
+  speedAz = segSpeedAz[0];
+  speedAlt = segSpeedAlt[0];
+
+  tracking = true;
+  return true;
+}
+
+// avanca na agenda conforme o tempo; o ultimo segmento fica valendo
+// ate chegar uma agenda nova
+void updateSchedule()
+{
+  if (segCount == 0)
+    return;
+
+  unsigned long elapsed = millis() - segStartMs;
+  while (segIndex + 1 < segCount && elapsed >= segOffsetMs[segIndex + 1])
+    segIndex++;
+
+  speedAz = segSpeedAz[segIndex];
+  speedAlt = segSpeedAlt[segIndex];
+}